@@ -0,0 +1,93 @@
+"""Reuse compiled USWDS assets between generated projects."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from .cache import default_cache_dir
+
+# what `gulp init` and `gulp compile` put in the static directory
+ASSET_DIRS = ["css", "fonts", "img", "js", "sass"]
+
+BUNDLE_INDEX = "bundle.json"
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class AssetBundleCache:
+    """Compiled static assets, keyed by the hash of what they were built from.
+
+    The output of the USWDS gulp pipeline only depends on the installed
+    packages and the gulpfile, so once it has been built the files under
+    ASSET_DIRS are kept in the cache along with the hash of each one. A
+    bundle whose files don't match their hashes is thrown away.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = Path(cache_dir) / "uswds-assets"
+
+    @staticmethod
+    def key(*inputs):
+        """Return the cache key for bundles built from the given bytes."""
+        return _hash("\n".join(_hash(data) for data in inputs).encode("ascii"))
+
+    def _entry(self, key):
+        return self.cache_dir / key
+
+    def has(self, key):
+        return (self._entry(key) / BUNDLE_INDEX).is_file()
+
+    def load(self, key):
+        """Return a dict of the files in the bundle for key, or None.
+
+        Keys are posix paths relative to the static directory and values
+        are the contents of each file.
+        """
+        entry = self._entry(key)
+        try:
+            hashes = json.loads((entry / BUNDLE_INDEX).read_text())
+            files = {name: (entry / name).read_bytes() for name in hashes}
+        except (OSError, ValueError):
+            return None
+        if any(_hash(data) != hashes[name] for name, data in files.items()):
+            # corrupted, build it again
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        return files
+
+    def store(self, key, static_dir):
+        """Keep the assets under static_dir as the bundle for key."""
+        if self.has(key):
+            return
+        static_dir = Path(static_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=f".{key}."))
+        try:
+            hashes = {}
+            for asset_dir in ASSET_DIRS:
+                if not (static_dir / asset_dir).is_dir():
+                    continue
+                for path in sorted((static_dir / asset_dir).rglob("*")):
+                    if not path.is_file():
+                        continue
+                    name = path.relative_to(static_dir).as_posix()
+                    data = path.read_bytes()
+                    (staging / name).parent.mkdir(parents=True, exist_ok=True)
+                    (staging / name).write_bytes(data)
+                    hashes[name] = _hash(data)
+            (staging / BUNDLE_INDEX).write_text(json.dumps(hashes, indent=2))
+            os.rename(staging, self._entry(key))
+        except OSError:
+            # somebody else stored it first
+            if not self.has(key):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,158 @@
+"""Generate many projects from a spec file using a pool of processes."""
+
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+from click import BadParameter, ClickException
+
+from .bulk_copy import COPY
+from .cache import default_cache_dir
+from .downloads import DEFAULT_TTL, DownloadCache
+from .project_creator import TEMPLATES_DIR, ProjectCreator, check_config
+from .template_index import TemplateIndex
+
+
+def _merge(base, overrides):
+    """Return a copy of base with overrides applied, merging nested dicts."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_spec(spec_path, base_config=None):
+    """Read a batch spec file and return a list of (app_name, config) pairs.
+
+    The spec is YAML (or JSON) with a list of `projects`, each of which has
+    an `app_name` and any config options for that project, and optional
+    `defaults` that apply to every project:
+
+        defaults:
+          github_actions: true
+          cloud_gov:
+            organization: my-org
+        projects:
+          - app_name: first-app
+          - app_name: second-app
+            uswds: true
+
+    `base_config` holds the options that the spec's defaults are applied on
+    top of. Each project's config is checked with check_config, so that a
+    bad option stops the batch before any project is generated.
+    """
+    with open(spec_path, "r") as f:
+        spec = yaml.safe_load(f)
+    if not isinstance(spec, dict) or not isinstance(spec.get("projects"), list):
+        raise ClickException(f"{spec_path} needs a list of projects")
+
+    defaults = _merge(base_config or {}, spec.get("defaults") or {})
+    projects = []
+    for project in spec["projects"]:
+        if not isinstance(project, dict) or not project.get("app_name"):
+            raise ClickException(f"Every project in {spec_path} needs an app_name")
+        config = _merge(defaults, project)
+        app_name = str(config.pop("app_name"))
+        try:
+            check_config(config)
+        except BadParameter as error:
+            raise ClickException(f"{app_name} in {spec_path}: {error.format_message()}")
+        projects.append((app_name, config))
+    return projects
+
+
+class BatchResult:
+    """What happened when generating one project of a batch."""
+
+    def __init__(self, app_name, seconds, error=None):
+        self.app_name = app_name
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def _generate_project(app_name, config, options):
+    """Generate a single project, in a worker process."""
+    start = time.perf_counter()
+    try:
+        downloads = DownloadCache(
+            cache_dir=options["cache_dir"],
+            ttl=options["download_ttl"],
+            offline=options["offline"],
+            mirror=options["download_mirror"],
+        )
+        creator = ProjectCreator(
+            dest_dir=app_name,
+            config=config,
+            downloads=downloads,
+            cache_dir=options["cache_dir"],
+            update=options["update"],
+            link=options["link"],
+        )
+        creator.run(jobs=options["jobs"])
+    except Exception:
+        # tracebacks always pickle, the exception itself might not
+        return BatchResult(
+            app_name, time.perf_counter() - start, traceback.format_exc()
+        )
+    return BatchResult(app_name, time.perf_counter() - start)
+
+
+def _warm_caches(options):
+    """Fill the shared caches once so the workers don't each do it."""
+    TemplateIndex(TEMPLATES_DIR, cache_dir=options["cache_dir"]).precompile()
+
+    downloads = DownloadCache(
+        cache_dir=options["cache_dir"],
+        ttl=options["download_ttl"],
+        offline=options["offline"],
+        mirror=options["download_mirror"],
+    )
+    for url in ProjectCreator.remote_urls():
+        downloads.fetch(url)
+
+
+def run_batch(
+    projects,
+    processes=None,
+    jobs=1,
+    cache_dir=None,
+    offline=False,
+    download_mirror=None,
+    download_ttl=DEFAULT_TTL,
+    update=False,
+    link=COPY,
+):
+    """Generate every project in `projects` using up to `processes` processes.
+
+    `projects` is a list of (app_name, config) pairs like load_spec returns.
+    All of the workers share the same cache directory, which is filled with
+    compiled templates and downloads before any of them start. Returns a
+    list of BatchResults in the same order as `projects`.
+    """
+    options = {
+        "jobs": jobs,
+        "cache_dir": cache_dir if cache_dir is not None else default_cache_dir(),
+        "offline": offline,
+        "download_mirror": download_mirror,
+        "download_ttl": download_ttl,
+        "update": update,
+        "link": link,
+    }
+    _warm_caches(options)
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_generate_project, app_name, config, options)
+            for app_name, config in projects
+        ]
+        return [future.result() for future in futures]
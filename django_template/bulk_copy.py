@@ -0,0 +1,139 @@
+"""Copy files without passing their contents through Python."""
+
+import errno
+import os
+import stat
+import sys
+
+from pathlib import Path
+
+COPY = "copy"
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+LINK_MODES = (COPY, REFLINK, HARDLINK)
+
+# ioctl that makes a copy-on-write clone of a file on btrfs, xfs and others
+_FICLONE = 0x40049409
+
+# errors that mean a kind of copy isn't supported here, so try the next one
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ENOTTY,
+    errno.EBADF,
+}
+
+_CHUNK = 1 << 30
+
+
+def reflink_fd(src_fd, dst_fd):
+    """Make dst_fd a copy-on-write clone of src_fd.
+
+    Raises OSError if the platform or filesystem can't do it.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are only supported on Linux")
+    import fcntl
+
+    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd, dst_fd):
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not available")
+    offset = 0
+    while True:
+        copied = os.copy_file_range(src_fd, dst_fd, _CHUNK, offset, offset)
+        if copied == 0:
+            return
+        offset += copied
+
+
+def _sendfile(src_fd, dst_fd):
+    offset = 0
+    while True:
+        copied = os.sendfile(dst_fd, src_fd, offset, _CHUNK)
+        if copied == 0:
+            return
+        offset += copied
+
+
+def _read_write(src_fd, dst_fd):
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    while True:
+        data = os.read(src_fd, 1 << 20)
+        if not data:
+            return
+        os.write(dst_fd, data)
+
+
+def copy_fd(src_fd, dst_fd):
+    """Copy the contents of src_fd into the empty file dst_fd.
+
+    The kernel copies the data itself with copy_file_range or sendfile
+    where it can, and it's only read into Python when neither works.
+    """
+    for method in (_copy_file_range, _sendfile):
+        try:
+            method(src_fd, dst_fd)
+            return
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+            # start the next method over from an empty file
+            os.ftruncate(dst_fd, 0)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+    _read_write(src_fd, dst_fd)
+
+
+def _hardlink(source, destination):
+    """Replace destination with a hardlink to source, or return False."""
+    temporary = destination.with_name(f".{destination.name}.link")
+    try:
+        os.link(source, temporary)
+        os.replace(temporary, destination)
+    except OSError:
+        if temporary.exists():
+            temporary.unlink()
+        return False
+    return True
+
+
+def copy_file(source, destination, mode=None, link=COPY):
+    """Copy source to destination, setting the destination's mode.
+
+    `link` picks how: COPY always makes an independent copy, REFLINK
+    clones the file's blocks copy-on-write where the filesystem supports it,
+    and HARDLINK makes destination another name for source (so its mode is
+    source's and editing it in place edits source too). Both fall back to
+    copying when they can't be done.
+    """
+    destination = Path(destination)
+    if link == HARDLINK and _hardlink(source, destination):
+        return
+
+    try:
+        if destination.lstat().st_nlink > 1 or destination.is_symlink():
+            # don't write through a link into some other file
+            destination.unlink()
+    except FileNotFoundError:
+        pass
+
+    with open(source, "rb") as src:
+        dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            if mode is None:
+                mode = os.fstat(src.fileno()).st_mode
+            os.fchmod(dst_fd, stat.S_IMODE(mode))
+            if link == REFLINK:
+                try:
+                    reflink_fd(src.fileno(), dst_fd)
+                    return
+                except OSError:
+                    pass
+            copy_fd(src.fileno(), dst_fd)
+        finally:
+            os.close(dst_fd)
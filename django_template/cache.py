@@ -0,0 +1,94 @@
+"""Locations and helpers for the on-disk caches shared between runs."""
+
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from .bulk_copy import reflink_fd
+
+
+def default_cache_dir():
+    """Return the directory to keep our caches in.
+
+    $DJANGO_TEMPLATE_CACHE_DIR wins if it is set, otherwise this follows
+    the XDG convention of ~/.cache/django-template.
+    """
+    if os.environ.get("DJANGO_TEMPLATE_CACHE_DIR"):
+        return Path(os.environ["DJANGO_TEMPLATE_CACHE_DIR"])
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache_home) / "django-template"
+
+
+def atomic_write(path, data):
+    """Write bytes to path so that readers never see a partial file.
+
+    Several generator runs can share a cache, so the data is written to a
+    temporary file next to the destination and then renamed into place.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def _reflink(source, destination):
+    """Clone source to destination sharing its blocks, if the OS supports it."""
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            reflink_fd(src.fileno(), dst.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(destination)
+            raise
+    shutil.copymode(source, destination)
+
+
+def _hardlink(source, destination):
+    os.link(source, destination)
+
+
+# cheapest first, every filesystem can do the last one
+_CLONE_METHODS = (_reflink, _hardlink, shutil.copy2)
+
+
+def clone_file(source, destination):
+    """Make destination a copy of source as cheaply as possible.
+
+    A copy-on-write reflink is tried first, then a hardlink, and finally an
+    ordinary copy. Hardlinked files share their contents, so they must be
+    replaced rather than edited in place.
+    """
+    for method in _CLONE_METHODS[:-1]:
+        try:
+            return method(source, destination)
+        except OSError:
+            pass
+    return _CLONE_METHODS[-1](source, destination)
+
+
+def clone_tree(source, destination):
+    """Copy the directory tree source to destination, cloning each file.
+
+    Symbolic links are copied as links, and destination must not exist.
+    Once a way of cloning fails it isn't tried again for the rest of the
+    tree, since it will most likely fail for every file.
+    """
+    methods = list(_CLONE_METHODS)
+
+    def copy(src, dst):
+        while len(methods) > 1:
+            try:
+                return methods[0](src, dst)
+            except OSError:
+                methods.pop(0)
+        return methods[0](src, dst)
+
+    shutil.copytree(source, destination, symlinks=True, copy_function=copy)
@@ -0,0 +1,134 @@
+"""Download remote files through a local, content-addressed cache."""
+
+import hashlib
+import json
+import time
+
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from click import ClickException, echo
+from requests import RequestException, Session
+
+from .cache import atomic_write, default_cache_dir
+from .profiling import record
+
+# re-check cached files with the server once they are a day old
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class DownloadError(ClickException):
+    """A file could not be downloaded or found in the cache."""
+
+
+class DownloadCache:
+    """Fetch remote files, keeping a copy of each one in a cache directory.
+
+    Each URL has an index entry (keyed by the hash of the URL) that records
+    the server's ETag and Last-Modified headers and the hash of the content,
+    and the content itself is stored under its own hash. Entries younger
+    than `ttl` seconds are used without asking the server, older ones are
+    revalidated with a conditional request.
+
+    With `offline`, only the mirror and the cache are used. `mirror` is a
+    local directory laid out like `wget --force-directories`, e.g.
+    <mirror>/raw.githubusercontent.com/18F/open-source-policy/master/LICENSE.md,
+    that is checked before the cache.
+    """
+
+    def __init__(
+        self, cache_dir=None, ttl=DEFAULT_TTL, offline=False, mirror=None, session=None
+    ):
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = Path(cache_dir) / "downloads"
+        self.ttl = ttl
+        self.offline = offline
+        self.mirror = Path(mirror) if mirror is not None else None
+        # share one session so that connections are reused between downloads
+        self.session = session if session is not None else Session()
+
+    def _index_path(self, url):
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / "index" / f"{url_hash}.json"
+
+    def _object_path(self, content_hash):
+        return self.cache_dir / "objects" / content_hash
+
+    def _mirror_path(self, url):
+        parts = urlsplit(url)
+        return self.mirror / parts.netloc / parts.path.lstrip("/")
+
+    def _read_entry(self, url):
+        """Return the cache index entry for url, or None if it isn't usable."""
+        try:
+            entry = json.loads(self._index_path(url).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        if not self._object_path(entry["sha256"]).exists():
+            return None
+        return entry
+
+    def _write_entry(self, url, entry):
+        atomic_write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _store(self, url, content, headers):
+        """Put content into the cache and return it."""
+        content_hash = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(content_hash)
+        if not object_path.exists():
+            atomic_write(object_path, content)
+        self._write_entry(
+            url,
+            {
+                "url": url,
+                "sha256": content_hash,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            },
+        )
+        return content
+
+    def fetch(self, url):
+        """Return the contents of url as bytes."""
+        if self.mirror is not None:
+            mirror_path = self._mirror_path(url)
+            if mirror_path.is_file():
+                return mirror_path.read_bytes()
+
+        entry = self._read_entry(url)
+        if entry is not None:
+            cached = self._object_path(entry["sha256"])
+            if self.offline or time.time() - entry["fetched_at"] < self.ttl:
+                return cached.read_bytes()
+
+        if self.offline:
+            raise DownloadError(
+                f"{url} is not in the download cache at {self.cache_dir} "
+                "and we are offline."
+            )
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=30)
+            if response.status_code == 304 and entry is not None:
+                # still fresh, reset the clock on our copy
+                entry["fetched_at"] = time.time()
+                self._write_entry(url, entry)
+                return cached.read_bytes()
+            response.raise_for_status()
+        except RequestException as error:
+            if entry is None:
+                raise DownloadError(f"Could not download {url}: {error}")
+            echo(f"Could not download {url}, using the cached copy instead.")
+            return cached.read_bytes()
+
+        record("network_bytes", len(response.content))
+        return self._store(url, response.content, response.headers)
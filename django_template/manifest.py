@@ -0,0 +1,98 @@
+"""Record of the files written into a generated project."""
+
+import hashlib
+import json
+import threading
+
+MANIFEST_NAME = ".django-template-manifest.json"
+
+ADDED = "added"
+CHANGED = "changed"
+SKIPPED = "skipped"
+MODIFIED = "modified"
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """Content hashes of every file the generator wrote into a project.
+
+    The manifest is kept in the project's output. In update mode it
+    is used to decide which files need to be written: files whose content
+    wouldn't change are left alone so their mtimes stay the same, and files
+    that were edited since the generator last wrote them are never
+    overwritten.
+    """
+
+    def __init__(self, output, update=False):
+        self.output = output
+        self.update = update
+        try:
+            self.recorded = json.loads(output.read(MANIFEST_NAME))["files"]
+        except (KeyError, TypeError, ValueError):
+            self.recorded = {}
+        self.files = dict(self.recorded)
+        # what happened to each file, by name, the first time it was written
+        self.statuses = {}
+        # steps can write files from several threads at once
+        self._lock = threading.Lock()
+
+    def _status(self, name, new_hash):
+        if not self.output.exists(name):
+            return ADDED
+        current = self.output.read(name)
+        if not self.update or current is None:
+            return CHANGED
+        current_hash = _hash(current)
+        if current_hash == new_hash:
+            return SKIPPED
+        if self.recorded.get(name) != current_hash:
+            # either edited since we wrote it, or we never wrote it at all
+            return MODIFIED
+        return CHANGED
+
+    def should_write(self, name, data):
+        """Record that data is meant for a file and return True to write it.
+
+        `name` is the file's posix path relative to the project.
+        """
+        return self.should_write_hash(name, _hash(data))
+
+    def should_write_hash(self, name, new_hash):
+        """Like should_write, for data whose sha256 hex digest is new_hash."""
+        status = self._status(name, new_hash)
+        with self._lock:
+            # some files are written by more than one step
+            self.statuses.setdefault(name, status)
+            if status != MODIFIED:
+                self.files[name] = new_hash
+        return status in (ADDED, CHANGED)
+
+    @property
+    def results(self):
+        """Return the names of the files by what happened to them."""
+        results = {status: [] for status in (ADDED, CHANGED, SKIPPED, MODIFIED)}
+        with self._lock:
+            for name, status in sorted(self.statuses.items()):
+                results[status].append(name)
+        return results
+
+    def save(self):
+        """Write the manifest into the project."""
+        content = json.dumps({"files": dict(sorted(self.files.items()))}, indent=2)
+        self.output.write(MANIFEST_NAME, (content + "\n").encode("utf-8"))
+
+    def summary(self):
+        """Return lines describing what happened to each file."""
+        results = self.results
+        lines = [
+            f"{len(results[ADDED])} added, {len(results[CHANGED])} changed, "
+            f"{len(results[SKIPPED])} unchanged, "
+            f"{len(results[MODIFIED])} modified by you and left alone"
+        ]
+        for status in (ADDED, CHANGED, MODIFIED):
+            for name in results[status]:
+                lines.append(f"  {status}: {name}")
+        return lines
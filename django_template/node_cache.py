@@ -0,0 +1,62 @@
+"""Reuse installed node_modules between generated projects."""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from .cache import clone_tree, default_cache_dir
+
+
+class NodeModulesCache:
+    """Installed node_modules directories, keyed by the lockfile they came from.
+
+    Every project gets the same package-lock.json, so after the first
+    `npm install` its node_modules is kept in the cache and later projects
+    get a clone of it instead of installing everything again. Files are
+    reflinked or hardlinked where the filesystem allows it.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = Path(cache_dir) / "node_modules"
+
+    @staticmethod
+    def key(lockfile):
+        """Return the cache key for the contents of a package-lock.json."""
+        return hashlib.sha256(lockfile).hexdigest()
+
+    def _entry(self, key):
+        return self.cache_dir / key / "node_modules"
+
+    def restore(self, key, destination):
+        """Clone the cached node_modules for key to destination.
+
+        Returns False if nothing is cached for key.
+        """
+        entry = self._entry(key)
+        if not entry.is_dir():
+            return False
+        clone_tree(entry, destination)
+        return True
+
+    def store(self, key, source):
+        """Keep a clone of the node_modules directory source for key."""
+        if self._entry(key).is_dir():
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # build the entry next to where it goes and rename it into place, so
+        # that other runs sharing the cache never see half of it
+        staging = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=f".{key}."))
+        try:
+            clone_tree(source, staging / "node_modules")
+            os.rename(staging, self.cache_dir / key)
+        except OSError:
+            # somebody else stored it first
+            if not self._entry(key).is_dir():
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,197 @@
+"""Places that a generated project can be written to."""
+
+import io
+import stat
+import tarfile
+import threading
+import time
+import zipfile
+
+from pathlib import Path, PurePosixPath
+
+from .bulk_copy import COPY, copy_file
+
+DEFAULT_FILE_MODE = 0o644
+DEFAULT_DIR_MODE = 0o755
+
+
+def _name(relative_path):
+    """Normalize a path relative to the project root into a posix string."""
+    name = PurePosixPath(Path(relative_path).as_posix())
+    if name.is_absolute() or ".." in name.parts:
+        raise ValueError(f"{relative_path} is not inside the project")
+    return str(name)
+
+
+class FilesystemOutput:
+    """Write the project into a directory on disk.
+
+    `link` is how copied files are made, one of the bulk_copy link modes.
+    """
+
+    # subprocesses like git and npm can only run on a real directory
+    on_disk = True
+
+    def __init__(self, root, link=COPY):
+        self.root = Path(root)
+        self.link = link
+
+    def write(self, relative_path, data, mode=None):
+        path = self.root / _name(relative_path)
+        path.write_bytes(data)
+        if mode is not None:
+            path.chmod(mode)
+
+    def copy(self, relative_path, source, mode=None):
+        """Copy the file at source into the project."""
+        copy_file(source, self.root / _name(relative_path), mode, link=self.link)
+
+    def chmod(self, relative_path, mode):
+        (self.root / _name(relative_path)).chmod(mode)
+
+    def read(self, relative_path):
+        """Return the contents of a file, or None if it doesn't exist."""
+        try:
+            return (self.root / _name(relative_path)).read_bytes()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def exists(self, relative_path):
+        return (self.root / _name(relative_path)).exists()
+
+    def make_dirs(self, relative_path):
+        (self.root / _name(relative_path)).mkdir(parents=True, exist_ok=True)
+
+    def remove(self, relative_path):
+        (self.root / _name(relative_path)).unlink(missing_ok=True)
+
+    def close(self):
+        pass
+
+
+class MemoryOutput:
+    """Keep the project in memory, for tests and dry runs.
+
+    `files` maps each file's posix path to a (data, mode) tuple and `dirs`
+    is the set of directories that were made.
+    """
+
+    on_disk = False
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = set()
+        self._lock = threading.Lock()
+
+    def write(self, relative_path, data, mode=None):
+        name = _name(relative_path)
+        with self._lock:
+            if mode is None:
+                mode = self.files.get(name, (None, DEFAULT_FILE_MODE))[1]
+            self.files[name] = (bytes(data), mode & 0o7777)
+
+    def copy(self, relative_path, source, mode=None):
+        self.write(relative_path, Path(source).read_bytes(), mode)
+
+    def chmod(self, relative_path, mode):
+        name = _name(relative_path)
+        with self._lock:
+            self.files[name] = (self.files[name][0], mode & 0o7777)
+
+    def read(self, relative_path):
+        entry = self.files.get(_name(relative_path))
+        return entry[0] if entry is not None else None
+
+    def exists(self, relative_path):
+        name = _name(relative_path)
+        return name == "." or name in self.files or name in self.dirs
+
+    def make_dirs(self, relative_path):
+        name = PurePosixPath(_name(relative_path))
+        with self._lock:
+            for directory in [name, *name.parents]:
+                if str(directory) != ".":
+                    self.dirs.add(str(directory))
+
+    def remove(self, relative_path):
+        with self._lock:
+            self.files.pop(_name(relative_path), None)
+
+    def close(self):
+        pass
+
+
+class ArchiveOutput(MemoryOutput):
+    """Write the project into a .tar.gz or .zip archive.
+
+    The project is kept in memory like a MemoryOutput, so files can still
+    be changed, have their mode set or be removed, and is written into the
+    archive under a top-level directory called `root` when the output is
+    closed, without staging anything on disk.
+    """
+
+    def __init__(self, archive, root):
+        """Make an archive at `archive`, a path or a writable binary file.
+
+        The format comes from the archive's name: .zip for zip files and
+        .tar.gz or .tgz for gzipped tar files.
+        """
+        super().__init__()
+        self.archive = archive
+        self.root = PurePosixPath(root)
+        self.mtime = time.time()
+
+        name = str(getattr(archive, "name", archive))
+        if name.endswith(".zip"):
+            self.format = "zip"
+        elif name.endswith((".tar.gz", ".tgz")):
+            self.format = "tar"
+        else:
+            raise ValueError(f"Can't tell the archive format of {name}")
+
+    def _entries(self):
+        """Return (name, data, mode, is_dir) for everything, parents first."""
+        entries = [(name, b"", DEFAULT_DIR_MODE, True) for name in self.dirs]
+        entries += [
+            (name, data, mode, False) for name, (data, mode) in self.files.items()
+        ]
+        return sorted(entries, key=lambda entry: PurePosixPath(entry[0]).parts)
+
+    def _add_tar(self, tar, name, data, mode, is_dir):
+        info = tarfile.TarInfo(str(self.root / name))
+        info.mode = mode
+        info.mtime = self.mtime
+        if is_dir:
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+        else:
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    def _add_zip(self, zip_file, name, data, mode, is_dir):
+        archive_name = str(self.root / name)
+        if is_dir:
+            archive_name += "/"
+            mode |= stat.S_IFDIR
+        else:
+            mode |= stat.S_IFREG
+        info = zipfile.ZipInfo(archive_name, time.localtime(self.mtime)[:6])
+        info.external_attr = (mode & 0xFFFF) << 16
+        info.compress_type = zipfile.ZIP_DEFLATED
+        zip_file.writestr(info, data)
+
+    def close(self):
+        with self._lock:
+            if self.format == "zip":
+                archive = zipfile.ZipFile(self.archive, "w", zipfile.ZIP_DEFLATED)
+                add = self._add_zip
+            elif isinstance(self.archive, (str, Path)):
+                archive = tarfile.open(str(self.archive), "w|gz")
+                add = self._add_tar
+            else:
+                archive = tarfile.open(fileobj=self.archive, mode="w|gz")
+                add = self._add_tar
+            with archive:
+                add(archive, ".", b"", DEFAULT_DIR_MODE, True)
+                for entry in self._entries():
+                    add(archive, *entry)
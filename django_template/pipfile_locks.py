@@ -0,0 +1,108 @@
+"""Pipfile.lock files for every Pipfile that a project can be generated with.
+
+The Pipfile template adds packages for the ASGI server, the Redis cache
+and Jinja2, and `pipenv install --deploy` refuses a Pipfile.lock that
+wasn't made from the same Pipfile, so templates/locks has a lock file for
+each combination of those options. After changing templates/Pipfile,
+make them again with
+
+    python -m django_template.pipfile_locks
+
+which needs pipenv. It keeps the versions that are locked already, where
+they still fit, and `--upgrade` locks the newest versions of everything.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+LOCKS_DIR = TEMPLATES_DIR / "locks"
+
+# generated projects run on this Python, see templates/runtime.txt
+PYTHON_VERSION = "3.10"
+
+
+def lock_name(config):
+    """Return the name of the lock file, in LOCKS_DIR, for a project's config."""
+    parts = [config["server"]]
+    if config["cache_backend"] == "redis":
+        parts.append("redis")
+    if config["jinja2"]:
+        parts.append("jinja2")
+    return "-".join(parts) + ".lock"
+
+
+def variants():
+    """Return a config for each different Pipfile."""
+    from .project_creator import SERVERS
+
+    return [
+        {"server": server, "cache_backend": cache_backend, "jinja2": jinja2}
+        for server in SERVERS
+        for cache_backend in ["locmem", "redis"]
+        for jinja2 in [False, True]
+    ]
+
+
+def render_pipfile(config):
+    """Return the Pipfile of a project with config."""
+    environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    return environment.get_template("Pipfile").render(config)
+
+
+def lock(config, upgrade=False, python=PYTHON_VERSION):
+    """Lock the Pipfile for config with pipenv and write its lock file."""
+    destination = LOCKS_DIR / lock_name(config)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        (directory / "Pipfile").write_text(render_pipfile(config))
+        # start from the lock of the Pipfile without any options, for new ones
+        seed = (
+            destination
+            if destination.exists()
+            else LOCKS_DIR / lock_name(variants()[0])
+        )
+        if seed.exists() and not upgrade:
+            shutil.copyfile(seed, directory / "Pipfile.lock")
+            command = ["pipenv", "upgrade", "--lock-only"]
+        else:
+            command = ["pipenv", "lock"]
+        env = dict(
+            os.environ,
+            PIPENV_VENV_IN_PROJECT="1",
+            PIPENV_IGNORE_VIRTUALENVS="1",
+            PIPENV_YES="1",
+        )
+        subprocess.run(
+            [*command, "--python", python], cwd=directory, env=env, check=True
+        )
+        # check that the result is valid before replacing the old lock file
+        json.loads((directory / "Pipfile.lock").read_text())
+        shutil.copyfile(directory / "Pipfile.lock", destination)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--upgrade", action="store_true", help="lock the newest versions of everything"
+    )
+    parser.add_argument(
+        "--python", default=PYTHON_VERSION, help="the Python to resolve for"
+    )
+    args = parser.parse_args(argv)
+    LOCKS_DIR.mkdir(exist_ok=True)
+    for config in variants():
+        print(f"locking {lock_name(config)}")
+        lock(config, upgrade=args.upgrade, python=args.python)
+
+
+if __name__ == "__main__":
+    main()
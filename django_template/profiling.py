@@ -0,0 +1,112 @@
+"""Measure where the time goes while generating a project."""
+
+import cProfile
+import json
+import pstats
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# the StepStats of the step running in the current thread, if any
+_current_step = ContextVar("current_step", default=None)
+
+
+def record(field, amount):
+    """Add amount to a counter of the step that is currently running.
+
+    This does nothing when called outside of a profiled step, so code that
+    does I/O can record what it did without knowing about the profiler.
+    """
+    stats = _current_step.get()
+    if stats is not None:
+        stats.add(field, amount)
+
+
+class StepStats:
+    """Counters for a single step."""
+
+    FIELDS = (
+        "wall_seconds",
+        "subprocess_seconds",
+        "files_written",
+        "bytes_written",
+        "network_bytes",
+    )
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = None
+        self.counters = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, field, amount):
+        with self._lock:
+            self.counters[field] += amount
+
+    def to_dict(self):
+        return {"name": self.name, "started_at": self.started_at, **self.counters}
+
+
+class Profiler:
+    """Collect StepStats for every step, and optionally cProfile data.
+
+    With `cprofile`, each step is run under its own cProfile.Profile and the
+    results are combined when dumped. Only one profiler can be active at a
+    time, so the steps must run one after another.
+    """
+
+    def __init__(self, cprofile=False):
+        self.cprofile = cprofile
+        self.steps = []
+        self.started = time.perf_counter()
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        """Measure the step called name while the context is active."""
+        stats = StepStats(name)
+        stats.started_at = time.perf_counter() - self.started
+        with self._lock:
+            self.steps.append(stats)
+        token = _current_step.set(stats)
+        profile = cProfile.Profile() if self.cprofile else None
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.enable()
+            yield stats
+        finally:
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    self._profiles.append(profile)
+            stats.add("wall_seconds", time.perf_counter() - start)
+            _current_step.reset(token)
+
+    def report(self):
+        """Return the collected statistics as a dictionary."""
+        steps = [stats.to_dict() for stats in self.steps]
+        totals = {
+            field: sum(stats[field] for stats in steps)
+            for field in StepStats.FIELDS
+            if field != "wall_seconds"
+        }
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "totals": totals,
+            "steps": steps,
+        }
+
+    def write_report(self, path):
+        """Write the statistics to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def dump_cprofile(self, path):
+        """Write the combined cProfile data in pstats format."""
+        if not self._profiles:
+            return
+        pstats.Stats(*self._profiles).dump_stats(path)
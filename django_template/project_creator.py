@@ -1,26 +1,132 @@
 import re
 import subprocess
+import time
 
 from pathlib import Path
 
-from click import echo
-from jinja2 import Environment, FileSystemLoader
-from requests import get
+from click import BadParameter, echo
+
+from .assets import AssetBundleCache
+from .bulk_copy import COPY
+from .cache import default_cache_dir
+from .downloads import DownloadCache
+from .manifest import Manifest
+from .node_cache import NodeModulesCache
+from .output import FilesystemOutput
+from .pipfile_locks import lock_name
+from .profiling import Profiler, record
+from .steps import Step, run_steps, step
+from .template_index import TemplateIndex
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+POLICY_FILES_URL = "https://raw.githubusercontent.com/18F/open-source-policy/master/"
+POLICY_FILES = ["CONTRIBUTING.md", "LICENSE.md"]
+# choices for the cache backend of a project's production settings
+CACHE_BACKENDS = ["locmem", "file", "db", "redis"]
+
+# choices for where a project keeps sessions
+SESSION_BACKENDS = ["db", "cached_db", "cache", "signed_cookies"]
+
+# cache backends that every instance and worker shares, which sessions in
+# the cache need
+SHARED_CACHE_BACKENDS = ["db", "redis"]
+
+# how a project is served: WSGI under gunicorn's gevent workers, or ASGI
+# under gunicorn's uvicorn workers
+SERVERS = ["wsgi", "asgi"]
+
+# cloud.gov RDS plans and about how many connections each one allows, from
+# AWS's default max_connections for the plan's instance class
+RDS_PLANS = {
+    "micro-psql": 80,
+    "small-psql": 170,
+    "medium-psql": 800,
+    "large-psql": 1600,
+}
+
+
+def check_config(config):
+    """Raise BadParameter if a project can't be generated with config.
+
+    Options that config doesn't have get their defaults from ProjectCreator.
+    """
+    choices = {
+        "cache_backend": CACHE_BACKENDS,
+        "session_backend": SESSION_BACKENDS,
+        "rds_plan": list(RDS_PLANS),
+        "server": SERVERS,
+    }
+    for name, allowed in choices.items():
+        if name in config and config[name] not in allowed:
+            raise BadParameter(
+                f"{config[name]!r} is not one of {', '.join(allowed)}",
+                param_hint=f"--{name.replace('_', '-')}",
+            )
+    session_backend = config.get("session_backend", "db")
+    cache_backend = config.get("cache_backend", "locmem")
+    if (
+        session_backend in ("cache", "cached_db")
+        and cache_backend not in SHARED_CACHE_BACKENDS
+    ):
+        # otherwise a session that one worker deletes lives on in the others
+        raise BadParameter(
+            f"{session_backend} sessions need a cache that all workers share, "
+            f"--cache-backend {' or '.join(SHARED_CACHE_BACKENDS)}",
+            param_hint="--session-backend",
+        )
+
+
+GITIGNORE_URL = (
+    "https://raw.githubusercontent.com/github/gitignore/master/Python.gitignore"
+)
 
 
 class ProjectCreator:
-    def __init__(self, dest_dir=None, config=None):
+    def __init__(
+        self,
+        dest_dir=None,
+        config=None,
+        downloads=None,
+        cache_dir=None,
+        update=False,
+        profiler=None,
+        output=None,
+        link=COPY,
+    ):
         """Create a ProjectCreator.
 
         For use off of the command line, pass in dest_dir and a config
         dictionary, otherwise interative questions will be used to determine
         these things.
+
+        `cache_dir` is where downloads and compiled templates are cached
+        between runs, and `downloads` is the DownloadCache to fetch remote
+        files through. By default one using `cache_dir` is made.
+
+        With `update`, an existing project is regenerated in place: only
+        files whose content changes are written, and files that were edited
+        since they were generated are left alone.
+
+        `profiler` collects timing and I/O statistics for each step, by
+        default a new Profiler is used.
+
+        `output` is where the project's files are written, a FilesystemOutput
+        for dest_dir by default. Outputs that aren't on disk, like a
+        MemoryOutput or an ArchiveOutput, skip the steps that have to run
+        programs in the destination, like git and npm.
+
+        `link` is how files are copied from our templates into a directory,
+        see bulk_copy.copy_file.
         """
 
         if dest_dir is None:
             # destination wasn't given
             dest_dir = self.ask("What is the name of your project?")
         self.dest_dir = (Path("..") / Path(dest_dir)).resolve()
+        if output is None:
+            output = FilesystemOutput(self.dest_dir, link=link)
+        self.output = output
         self._ensure_destination_exists()
         self.app_name = self._make_identifier_from_path(self.dest_dir)
         echo(f"Creating Django app named {self.app_name} in directory {self.dest_dir}")
@@ -31,8 +137,29 @@ class ProjectCreator:
         else:
             self.config = config
         self.config["app_name"] = self.app_name
+        self.config.setdefault("cache_backend", "locmem")
+        self.config.setdefault("session_backend", "db")
+        self.config.setdefault("rds_plan", "micro-psql")
+        self.config.setdefault("server", "wsgi")
+        self.config.setdefault("jinja2", False)
+        self.config["db_max_connections"] = RDS_PLANS[self.config["rds_plan"]]
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        if downloads is None:
+            downloads = DownloadCache(cache_dir=self.cache_dir)
+        self.downloads = downloads
+        self.node_modules = NodeModulesCache(self.cache_dir)
+        self.uswds_assets = AssetBundleCache(self.cache_dir)
+        self.manifest = Manifest(self.output, update=update)
+        self.profiler = profiler if profiler is not None else Profiler()
         self._init_templates()
 
+    @staticmethod
+    def remote_urls():
+        """Return the URLs of the remote files that every project uses."""
+        return [POLICY_FILES_URL + filename for filename in POLICY_FILES] + [
+            GITIGNORE_URL
+        ]
+
     @staticmethod
     def _make_identifier_from_path(path):
         """Make path into a valid python identifier."""
@@ -42,35 +169,40 @@ class ProjectCreator:
         return re.sub(r"\W|^(?=\d)", "_", name)
 
     def _init_templates(self):
-        """Make a Jinja environment with our information."""
-        self.templates_dir = Path(__file__).parent / "templates"
-        self.templates = Environment(loader=FileSystemLoader(self.templates_dir))
-        self.templates.globals.update(self.config)
+        """Index our template files and make a Jinja environment for them."""
+        self.templates_dir = TEMPLATES_DIR
+        self.template_index = TemplateIndex(
+            self.templates_dir, globals=self.config, cache_dir=self.cache_dir
+        )
+        self.templates = self.template_index.environment
+
+    def _relative(self, path):
+        """Return path relative to self.dest_dir.
+
+        Relative paths are already inside self.dest_dir and are returned as
+        they are.
+        """
+        path = Path(path)
+        if path.is_absolute():
+            return path.resolve().relative_to(self.dest_dir)
+        return path
 
     def _ensure_path_exists(self, path):
         """Ensure that the given directory exists.
 
         If the path is relative, it is made inside of self.dest_dir.
         """
-        if path.is_absolute():
-            path.mkdir(parents=True, exist_ok=True)
-        else:
-            (self.dest_dir / path).mkdir(parents=True, exist_ok=True)
+        self.output.make_dirs(self._relative(path))
 
     def _ensure_destination_exists(self):
         """Ensure that the directory self.dest_dir exists."""
-        self._ensure_path_exists(self.dest_dir)
-
-    @staticmethod
-    def re_sub_file(filename, pattern, replace):
-        """Run a regexp-replace on the contents of an entire file.
+        if self.output.on_disk:
+            self.dest_dir.mkdir(parents=True, exist_ok=True)
 
-        Inspired by Thor's gsub_file.
-        """
-        with open(filename, "r") as f:
-            content = f.read()
-        with open(filename, "w") as f:
-            f.write(re.sub(pattern, replace, content, count=0, flags=re.MULTILINE))
+    def _require_disk(self, what):
+        """Raise an error if what can't be done because we aren't on disk."""
+        if not self.output.on_disk:
+            raise RuntimeError(f"Can't {what} unless writing to a directory")
 
     @staticmethod
     def ask(question):
@@ -99,33 +231,57 @@ class ProjectCreator:
 
         return responses
 
+    def write_bytes(self, relative_path, data, mode=None):
+        """Write bytes to a file in the destination directory.
+
+        All of our output goes through here so that it is recorded in the
+        manifest, and in update mode files that don't need to change are not
+        touched. If mode is specified, set it as the mode of the resulting
+        file.
+        """
+        name = self._relative(relative_path).as_posix()
+        if self.manifest.should_write(name, data):
+            self.output.write(name, data, mode)
+            record("files_written", 1)
+            record("bytes_written", len(data))
+        elif mode is not None and self.output.on_disk and self.output.exists(name):
+            self.output.chmod(name, mode)
+
     def write_file(self, relative_path, content, mode=None):
         """Write a file into the destination directory.
 
         If mode is specified, set it as the mode of the resulting file.
         """
-        file_path = self.dest_dir / relative_path
-        with open(file_path, "w") as f:
-            f.write(content)
+        self.write_bytes(relative_path, content.encode("utf-8"), mode)
 
-        if mode is not None:
-            file_path.chmod(mode)
+    def touch_file(self, relative_path):
+        """Create an empty file in the destination unless it already exists."""
+        if not self.output.exists(self._relative(relative_path)):
+            self.write_bytes(relative_path, b"")
 
     def copy_file(self, relative_source, relative_dest):
         """Copy a file from our templates directory into the destination.
 
         In addition to copying the contents, it also copies the file's mode.
+        The output copies the file itself, so on disk the contents never
+        pass through Python.
         """
-        dest_path = self.dest_dir / relative_dest
-        source_path = Path(__file__).parent / "templates" / relative_source
-        dest_path.write_bytes(source_path.read_bytes())
-        dest_path.chmod(source_path.stat().st_mode)
+        source = self.template_index[relative_source]
+        name = self._relative(relative_dest).as_posix()
+        if self.manifest.should_write_hash(name, source.sha256):
+            self.output.copy(name, source.path, source.mode)
+            record("files_written", 1)
+            record("bytes_written", source.size)
+        elif self.output.on_disk and self.output.exists(name):
+            self.output.chmod(name, source.mode)
 
     def write_templated_file(self, template_name, destination_path):
-        """Render a template and write it into the destination."""
-        template = self.templates.get_template(template_name)
-        if template.filename is not None:  # template comes from a file
-            template_mode = Path(template.filename).stat().st_mode
+        """Render a template and write it into the destination.
+
+        The resulting file gets the same mode as the template file.
+        """
+        template = self.template_index.get_template(template_name)
+        template_mode = self.template_index[template_name].mode
         self.write_file(destination_path, template.render(), template_mode)
 
     def _copy_directory_with_templates(self, relative_source_path, relative_dest_path):
@@ -134,32 +290,30 @@ class ProjectCreator:
         Files whose names end with .jinja will be template substituted as they
         are written. Any other files will be copied over directly.
         """
-        source_dir = self.templates_dir / relative_source_path
-        destination = self.dest_dir / relative_dest_path
+        source_dir = Path(relative_source_path)
+        destination = Path(relative_dest_path)
         self._ensure_path_exists(destination)
-        for f in source_dir.rglob("*"):
-            relative_f = f.relative_to(source_dir)
-            if f.is_dir():
+        for template_file in self.template_index.walk(source_dir):
+            relative_f = Path(template_file.name).relative_to(source_dir)
+            if template_file.is_dir:
                 # create the directory in the destination
-                self._ensure_path_exists(relative_dest_path / relative_f)
+                self._ensure_path_exists(destination / relative_f)
                 continue
-            if f.suffix == ".jinja":
+            if relative_f.suffix == ".jinja":
                 # template this file
                 self.write_templated_file(
-                    str(relative_source_path / relative_f),
-                    relative_dest_path / relative_f.with_suffix(""),
+                    template_file.name, destination / relative_f.with_suffix("")
                 )
             else:
                 # just copy it over
-                self.copy_file(f, relative_dest_path / relative_f)
+                self.copy_file(template_file.name, destination / relative_f)
 
     def download_file(self, url, relative_path):
-        """Download a remote file to the destination directory."""
-        local_filename = self.dest_dir / relative_path
-        with get(url, stream=True) as r:
-            with open(local_filename, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        """Download a remote file to the destination directory.
+
+        The file is served from the download cache when possible.
+        """
+        self.write_bytes(relative_path, self.downloads.fetch(url))
 
     def exec_in_destination(self, command):
         """Run a command in the destination directory.
@@ -168,78 +322,141 @@ class ProjectCreator:
 
         Returns stdout of the executed command.
         """
-        return subprocess.check_output(command, cwd=self.dest_dir, encoding="utf-8")
+        self._require_disk(f"run {command[0]}")
+        start = time.perf_counter()
+        try:
+            return subprocess.check_output(command, cwd=self.dest_dir, encoding="utf-8")
+        finally:
+            record("subprocess_seconds", time.perf_counter() - start)
 
     # Steps that are done when we run
 
+    @step(outputs=["README.md"])
     def create_readme(self):
         """Create a README file."""
-        template = self.templates.get_template("README.md.jinja")
+        template = self.template_index.get_template("README.md.jinja")
         self.write_file("README.md", template.render())
 
+    @step(outputs=["CONTRIBUTING.md", "LICENSE.md"])
     def get_policy_files(self):
         """Get license and contributing files from 18F open source policy."""
-        for filename in ["CONTRIBUTING.md", "LICENSE.md"]:
-            remote_url = f"https://raw.githubusercontent.com/18F/open-source-policy/master/{filename}"  # noqa
-            self.download_file(
-                remote_url, filename
-            )  # filename is relative to the dest_dir
+        for filename in POLICY_FILES:
+            # filename is relative to the dest_dir
+            self.download_file(POLICY_FILES_URL + filename, filename)
 
+    @step(outputs=[".git"])
     def initialize_git(self):
         """Initialize a git repository in the target if it doesn't exist."""
-        if not (self.dest_dir / ".git").exists():
+        if not self.output.on_disk:
+            # there is no repository for the hook to go in
+            return
+        if not self.output.exists(".git"):
             self.exec_in_destination(["git", "init", "."])
             # Use a different initial branch name than "master"
             self.exec_in_destination(["git", "branch", "-m", "main"])
 
+    @step(outputs=[".gitignore"])
     def get_gitignore(self):
         """Get the Python gitignore file from Github."""
-        self.download_file(
-            "https://raw.githubusercontent.com/github/gitignore/master/Python.gitignore",
-            ".gitignore",
-        )
-        # need to ignore node_modules too, and the generated files
-        with open(self.dest_dir / ".gitignore", "a") as f:
-            f.write("\nnode_modules\n")
-            # and the generated files from USWDS
-            f.write(f"\n{self.app_name}/{self.app_name}/static")
-
+        gitignore = self.downloads.fetch(GITIGNORE_URL).decode("utf-8")
+        # need to ignore node_modules too
+        gitignore += "\nnode_modules\n"
+        # and the generated files from USWDS
+        gitignore += f"\n{self.app_name}/{self.app_name}/static"
+        # and what collectstatic makes of them
+        gitignore += f"\n{self.app_name}/{self.app_name}/staticfiles"
+        # and what the load test leaves behind
+        gitignore += f"\n{self.app_name}/loadtest.sqlite3"
+        gitignore += f"\n{self.app_name}/loadtest-static"
+        self.write_file(".gitignore", gitignore)
+
+    @step(inputs=[".git"], outputs=[".git/hooks/pre-commit", ".flake8"])
     def setup_precommit_hook(self):
         """Set up a git precommit hook."""
-        self.write_templated_file("githooks/pre-commit.jinja", ".git/hooks/pre-commit")
+        if self.output.on_disk:
+            self.write_templated_file(
+                "githooks/pre-commit.jinja", ".git/hooks/pre-commit"
+            )
         # configure flake8 to be compatible with black
         self.write_templated_file("flake8", ".flake8")
 
+    @step(outputs=["Pipfile", "Pipfile.lock", "{app_name}"])
     def create_django_app(self):
         """Create the Django app."""
         # Add a Pipfile to the destination
         self.write_templated_file("Pipfile", "Pipfile")
-        # tentatively lock the versions
-        self.write_templated_file("Pipfile.lock", "Pipfile.lock")
-        # TODO: encourage users to do `pipenv lock` to get new dependency # versions
-        # self.exec_in_destination(["pipenv", "lock"])
-
-        # run django-admin startproject if necessary
-        if (self.dest_dir / self.app_name).exists():
-            # basic check to see if the app has been created
-            if (self.dest_dir / self.app_name / "manage.py").exists():
-                pass
-            else:
-                # if the directory already exists, give it as an argument to use
-                # the existing directory
-                self.exec_in_destination(
-                    ["django-admin", "startproject", self.app_name, self.app_name]
-                )
-        else:
-            self.exec_in_destination(["django-admin", "startproject", self.app_name])
+        # and the lock file made from the same Pipfile, which
+        # `pipenv install --deploy` checks
+        self.copy_file(f"locks/{lock_name(self.config)}", "Pipfile.lock")
+
+        # create the Django project unless it already exists
+        if not self.output.exists(Path(self.app_name) / "manage.py"):
+            self._create_django_project()
 
         # set up basic URL routing
         self.write_templated_file(
-            "django/urls.py", Path(self.app_name) / self.app_name / "urls.py"
+            "django/urls.py.jinja", Path(self.app_name) / self.app_name / "urls.py"
+        )
+        # a database backend that pools connections in each worker
+        self._copy_directory_with_templates(
+            "django/db_pool", Path(self.app_name) / self.app_name / "db_pool"
+        )
+        # gunicorn reads its settings from where bin/web.sh starts it
+        self.write_templated_file(
+            "django/gunicorn.conf.py.jinja", Path(self.app_name) / "gunicorn.conf.py"
+        )
+        # and helpers for caching expensive results
+        self.copy_file(
+            "django/caching.py", Path(self.app_name) / self.app_name / "caching.py"
+        )
+        # logging that doesn't block requests, for the production settings
+        self.copy_file(
+            "django/structured_logging.py",
+            Path(self.app_name) / self.app_name / "structured_logging.py",
+        )
+        # request timing and /metrics
+        self.copy_file(
+            "django/metrics.py", Path(self.app_name) / self.app_name / "metrics.py"
+        )
+        # a queue of background tasks in the database, and its worker
+        self._copy_directory_with_templates(
+            "django/tasks", Path(self.app_name) / self.app_name / "tasks"
+        )
+        # what base.html keys its cached fragments with
+        self.copy_file(
+            "django/context_processors.py",
+            Path(self.app_name) / self.app_name / "context_processors.py",
+        )
+        if self.config["jinja2"]:
+            # the environment of the Jinja2 backend
+            self.copy_file(
+                "django/jinja2.py", Path(self.app_name) / self.app_name / "jinja2.py"
+            )
+        # and query budgets for views
+        self.copy_file(
+            "django/query_budgets.py",
+            Path(self.app_name) / self.app_name / "query_budgets.py",
+        )
+        if self.config["session_backend"] in ("db", "cached_db"):
+            # sessions whose expired rows are deleted in batches
+            self.write_templated_file(
+                "django/sessions.py.jinja",
+                Path(self.app_name) / self.app_name / "sessions.py",
+            )
+        # a load test, with its URLs and baseline next to manage.py
+        self.write_templated_file(
+            "django/loadtest.py.jinja",
+            Path(self.app_name) / self.app_name / "loadtest.py",
         )
+        self.copy_file("django/loadtest.json", Path(self.app_name) / "loadtest.json")
+        if self.config["server"] == "asgi":
+            # with examples of async views
+            self.copy_file(
+                "django/views.py", Path(self.app_name) / self.app_name / "views.py"
+            )
         # set up Django templates
         template_dir = Path(self.app_name) / self.app_name / "templates"
-        (self.dest_dir / template_dir).mkdir(parents=True, exist_ok=True)
+        self._ensure_path_exists(template_dir)
         # copy because these are already jinja files
         self.copy_file("django/templates/base.html", template_dir / "base.html")
         self.copy_file(
@@ -248,22 +465,94 @@ class ProjectCreator:
 
         # set up basic integration tests
         test_dir = Path(self.app_name) / self.app_name / "tests"
-        (self.dest_dir / test_dir).mkdir(parents=True, exist_ok=True)
-        (self.dest_dir / test_dir / "__init__.py").touch()
+        self._ensure_path_exists(test_dir)
+        self.touch_file(test_dir / "__init__.py")
         self.write_templated_file(
             "django/tests/test_integration.py.jinja", test_dir / "test_integration.py"
         )
+        self.write_templated_file(
+            "django/tests/test_caching.py.jinja", test_dir / "test_caching.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_db_pool.py.jinja", test_dir / "test_db_pool.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_static_files.py.jinja", test_dir / "test_static_files.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_structured_logging.py.jinja",
+            test_dir / "test_structured_logging.py",
+        )
+        self.write_templated_file(
+            "django/tests/test_metrics.py.jinja", test_dir / "test_metrics.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_loadtest.py.jinja", test_dir / "test_loadtest.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_query_budgets.py.jinja",
+            test_dir / "test_query_budgets.py",
+        )
+        self.write_templated_file(
+            "django/tests/test_sessions.py.jinja", test_dir / "test_sessions.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_tasks.py.jinja", test_dir / "test_tasks.py"
+        )
+        self.write_templated_file(
+            "django/tests/test_templates.py.jinja", test_dir / "test_templates.py"
+        )
+        if self.config["server"] == "asgi":
+            self.write_templated_file(
+                "django/tests/test_views.py.jinja", test_dir / "test_views.py"
+            )
 
         # and a logs directory
         logs_dir = self.dest_dir / self.app_name / self.app_name / "logs"
         self._ensure_path_exists(logs_dir)
-        (logs_dir / ".gitkeep").touch()
+        self.touch_file(logs_dir / ".gitkeep")
 
         # and a static directory
         static_dir = self.dest_dir / self.app_name / self.app_name / "static"
         self._ensure_path_exists(static_dir)
-        (static_dir / ".gitkeep").touch()
+        self.touch_file(static_dir / ".gitkeep")
+
+        if self.config["jinja2"]:
+            # and a directory for Jinja2 templates
+            jinja2_dir = self.dest_dir / self.app_name / self.app_name / "jinja2"
+            self._ensure_path_exists(jinja2_dir)
+            self.touch_file(jinja2_dir / ".gitkeep")
 
+    def _create_django_project(self):
+        """Write the files that `django-admin startproject` would create.
+
+        Rendering our own templates saves starting up django-admin in a new
+        process, and lets the settings package be written in its final form
+        instead of moving and patching a generated settings.py.
+        """
+        project_dir = Path(self.app_name)
+        package_dir = project_dir / self.app_name
+        self._ensure_path_exists(package_dir / "settings")
+        self.write_templated_file(
+            "django/project/manage.py.jinja", project_dir / "manage.py"
+        )
+        self.copy_file("django/project/__init__.py", package_dir / "__init__.py")
+        self.write_templated_file(
+            "django/project/asgi.py.jinja", package_dir / "asgi.py"
+        )
+        self.write_templated_file(
+            "django/project/wsgi.py.jinja", package_dir / "wsgi.py"
+        )
+        self.copy_file(
+            "django/project/__init__.py", package_dir / "settings" / "__init__.py"
+        )
+        self.write_templated_file(
+            "settings/base.py.jinja", package_dir / "settings" / "base.py"
+        )
+
+    @step(
+        outputs=["Dockerfile", "docker-compose.yml", "{app_name}/docker_entrypoint.py"]
+    )
     def setup_docker(self):
         """Make a Dockerfile and docker-compose.yml in the destination."""
         self.copy_file("Dockerfile", "Dockerfile")
@@ -272,33 +561,19 @@ class ProjectCreator:
             "docker_entrypoint.py.jinja", Path(self.app_name) / "docker_entrypoint.py"
         )
 
+    @step(outputs=["zap.conf"])
     def setup_owasp(self):
         """Configuration for OWASP Zap scanning using docker-compose."""
         self.copy_file("zap.conf", "zap.conf")
 
     def _make_settings_directory(self):
         """Make a settings package instead of a single settings file."""
-        app_dir = self.dest_dir / self.app_name / self.app_name
+        app_dir = Path(self.app_name) / self.app_name
         settings_dir = app_dir / "settings"
 
         # should be idempotent
-        settings_dir.mkdir(exist_ok=True)
-        (settings_dir / "__init__.py").touch()
-        try:
-            (app_dir / "settings.py").replace(settings_dir / "base.py")
-        except FileNotFoundError:
-            pass
-
-        # base.py shouldn't define a SECRET_KEY
-        self.re_sub_file(settings_dir / "base.py", r"^\s*SECRET_KEY = .*$", "")
-
-        # patch the default settings to have a templates directory
-        base_file_path = settings_dir / "base.py"
-        with open(base_file_path, "r") as f:
-            contents = f.read()
-        contents = contents.replace('"DIRS": []', '"DIRS": [BASE_DIR / "templates"]')
-        with open(base_file_path, "w") as f:
-            f.write(contents)
+        self._ensure_path_exists(settings_dir)
+        self.touch_file(settings_dir / "__init__.py")
 
         # need this utility for other settings files
         self.copy_file(
@@ -306,6 +581,10 @@ class ProjectCreator:
             Path(self.app_name) / self.app_name / "settings" / "env.py",
         )
 
+    @step(
+        inputs=["{app_name}/{app_name}/settings"],
+        outputs=["{app_name}/{app_name}/settings"],
+    )
     def make_prod_settings(self):
         """Make a settings file for production."""
         self._make_settings_directory()
@@ -313,7 +592,16 @@ class ProjectCreator:
             "settings/prod.py.jinja",
             Path(self.app_name) / self.app_name / "settings" / "prod.py",
         )
+        # production settings that run on a developer's machine
+        self.write_templated_file(
+            "settings/loadtest.py.jinja",
+            Path(self.app_name) / self.app_name / "settings" / "loadtest.py",
+        )
 
+    @step(
+        inputs=["{app_name}/{app_name}/settings"],
+        outputs=["{app_name}/{app_name}/settings"],
+    )
     def make_dev_settings(self):
         """Make a settings file for production."""
         self._make_settings_directory()
@@ -322,6 +610,7 @@ class ProjectCreator:
             Path(self.app_name) / self.app_name / "settings" / "dev.py",
         )
 
+    @step(outputs=["package.json", "package-lock.json", "node_modules"], when="uswds")
     def set_up_npm(self):
         """install node modules in the destination."""
         self.write_templated_file(
@@ -331,26 +620,85 @@ class ProjectCreator:
         # tentatively lock dependency versions
         self.write_templated_file("package-lock.json", "package-lock.json")
         # TODO: encourage users to `npm update` for their own versions
-        self.exec_in_destination(["npm", "install"])
-
+        if not self.output.on_disk:
+            return
+        if self.config.get("skip_node_if_cached") and self.uswds_assets.has(
+            self._uswds_assets_key()
+        ):
+            # the compiled assets will come from the cache, node isn't needed
+            return
+        self._install_node_modules()
+
+    def _install_node_modules(self):
+        """Install node modules, reusing a cached install of the same lockfile."""
+        node_modules = self.dest_dir / "node_modules"
+        key = self.node_modules.key(self.output.read("package-lock.json"))
+        if node_modules.exists():
+            # already installed, npm only needs to catch up with any changes
+            self.exec_in_destination(["npm", "install"])
+        elif not self.node_modules.restore(key, node_modules):
+            self.exec_in_destination(["npm", "install"])
+            self.node_modules.store(key, node_modules)
+
+    @step(
+        inputs=["package.json", "package-lock.json", "node_modules"],
+        outputs=["gulpfile.js", "{app_name}/{app_name}/static"],
+        when="uswds",
+    )
     def set_up_uswds_templates(self):
         """install USWDS using npm and gulp."""
-        self.exec_in_destination(["npm", "install"])
-        # uswds is installed, what next?
         self.write_templated_file("gulpfile.js.jinja", "gulpfile.js")
+        static_dir = Path(self.app_name) / self.app_name / "static"
+        key = self._uswds_assets_key()
+        bundle = self.uswds_assets.load(key)
+        if bundle is not None:
+            for name, data in bundle.items():
+                self._ensure_path_exists((static_dir / name).parent)
+                self.write_bytes(static_dir / name, data)
+            return
+        if not self.output.on_disk:
+            # the assets are built by running gulp in the project
+            return
+        # uswds was installed by set_up_npm, what next?
         self.exec_in_destination(["npx", "gulp", "init"])
         self.exec_in_destination(["npx", "gulp", "compile"])
+        self.uswds_assets.store(key, self.dest_dir / static_dir)
+
+    def _uswds_assets_key(self):
+        """Return the cache key of the compiled USWDS assets.
+
+        They only depend on the locked npm packages and the gulpfile, whose
+        output paths are relative to the static directory, so the unrendered
+        templates are hashed and the key is the same for every project.
+        """
+        return self.uswds_assets.key(
+            self.template_index["package-lock.json"].path.read_bytes(),
+            self.template_index["gulpfile.js.jinja"].path.read_bytes(),
+        )
 
+    @step(outputs=[".circleci"], when="circleci")
     def set_up_circleci(self):
         """Set up CirclCI for CI/CD."""
         # CircleCI config file
         self._ensure_path_exists(Path(".circleci"))  # relative path is inside dest_dir
         self.write_templated_file("circleci/config.yml.jinja", ".circleci/config.yml")
 
+    @step(outputs=[".github"], when="github_actions")
     def set_up_github_actions(self):
         """Set up Github Actions for CI/CD."""
         self._copy_directory_with_templates("github", ".github")
 
+    @step(
+        outputs=[
+            "terraform",
+            "bin",
+            "manifest.yml",
+            "runtime.txt",
+            "config",
+            "Procfile",
+        ],
+        when="cloud_gov_terraform",
+    )
     def set_up_terraform(self):
         """Set up Terraform scripts to manage Cloud.gov infrastructure."""
         self._copy_directory_with_templates("terraform", "terraform")
@@ -364,30 +712,52 @@ class ProjectCreator:
 
     # main method that runs all of our steps
 
-    def run(self):
-        self.create_readme()
-        self.get_policy_files()
-        self.initialize_git()
-        self.get_gitignore()
-        self.setup_precommit_hook()
-
-        self.create_django_app()
-        self.make_prod_settings()
-        self.make_dev_settings()
+    def steps(self):
+        """Return the steps enabled by our config, in the order they are declared."""
+        methods = {}
+        for klass in reversed(type(self).__mro__):
+            for name, attribute in vars(klass).items():
+                if hasattr(attribute, "step_outputs"):
+                    methods[name] = attribute
+
+        steps = []
+        for name, method in methods.items():
+            if method.step_when is not None and not self.config.get(method.step_when):
+                continue
+            steps.append(
+                Step(
+                    name,
+                    self._profiled(name, getattr(self, name)),
+                    inputs=[path.format(**self.config) for path in method.step_inputs],
+                    outputs=[
+                        path.format(**self.config) for path in method.step_outputs
+                    ],
+                )
+            )
+        return steps
 
-        # opinionatedly run under Docker and docker-compose
-        self.setup_docker()
-        self.setup_owasp()
+    def _profiled(self, name, method):
+        """Return a function that runs method as the step called name."""
 
-        if self.config.get("uswds"):
-            self.set_up_npm()
-            self.set_up_uswds_templates()
+        def run_step():
+            with self.profiler.step(name):
+                method()
 
-        if self.config.get("circleci"):
-            self.set_up_circleci()
+        return run_step
 
-        if self.config.get("github_actions"):
-            self.set_up_github_actions()
+    def run(self, jobs=1):
+        """Run all of our steps.
 
-        if self.config.get("cloud_gov_terraform"):
-            self.set_up_terraform()
+        Steps that don't depend on each other are run concurrently in up to
+        `jobs` threads. Afterwards the manifest of generated files is saved,
+        and in update mode a summary of what changed is shown.
+        """
+        if self.profiler.cprofile and jobs > 1:
+            # steps in different threads would each start a cProfile.Profile
+            raise ValueError("cProfile can only profile one step at a time")
+        run_steps(self.steps(), jobs=jobs)
+        self.manifest.save()
+        self.output.close()
+        if self.manifest.update:
+            for line in self.manifest.summary():
+                echo(line)
@@ -0,0 +1,110 @@
+"""Declare ProjectCreator steps and run them as a dependency graph."""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def step(inputs=(), outputs=(), when=None):
+    """Mark a ProjectCreator method as a step of project generation.
+
+    `inputs` and `outputs` are the paths (relative to the destination, and
+    formatted with the project config so "{app_name}" can be used) that the
+    step reads and writes. Steps that touch overlapping paths are run in the
+    order they are declared and everything else may run concurrently.
+
+    If `when` is given, the step only runs when that config option is true.
+    """
+
+    def decorator(method):
+        method.step_inputs = tuple(inputs)
+        method.step_outputs = tuple(outputs)
+        method.step_when = when
+        return method
+
+    return decorator
+
+
+def _overlaps(paths, other_paths):
+    """Return True if any path is the same as or inside of any other path."""
+    for path in paths:
+        for other in other_paths:
+            if path == other or path.startswith(other + "/"):
+                return True
+            if other.startswith(path + "/"):
+                return True
+    return False
+
+
+class Step:
+    """A single named unit of work with the paths it reads and writes."""
+
+    def __init__(self, name, function, inputs=(), outputs=()):
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+    def depends_on(self, earlier):
+        """Return True if this step must wait for an earlier-declared step.
+
+        That is the case when this step reads or writes something the
+        earlier step writes, or writes something the earlier step reads.
+        """
+        reads_or_writes = self.inputs + self.outputs
+        return _overlaps(reads_or_writes, earlier.outputs) or _overlaps(
+            self.outputs, earlier.inputs
+        )
+
+
+def dependency_graph(steps):
+    """Map each step name to the names of the earlier steps it waits for."""
+    return {
+        current.name: [
+            earlier.name for earlier in steps[:index] if current.depends_on(earlier)
+        ]
+        for index, current in enumerate(steps)
+    }
+
+
+def run_steps(steps, jobs=1):
+    """Run a list of steps using up to `jobs` threads.
+
+    Steps are started in their declared order as soon as everything they
+    depend on has finished, so the result is the same as running them one
+    after another. If any step fails, no further steps are started and the
+    exception from the earliest-declared failing step is raised once the
+    running steps have finished.
+    """
+    if jobs <= 1:
+        for current in steps:
+            current.function()
+        return
+
+    graph = dependency_graph(steps)
+    order = {current.name: index for index, current in enumerate(steps)}
+    pending = list(steps)
+    finished = set()
+    running = {}
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if not failures:
+                for current in list(pending):
+                    if all(name in finished for name in graph[current.name]):
+                        pending.remove(current)
+                        running[pool.submit(current.function)] = current
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                current = running.pop(future)
+                if future.exception() is not None:
+                    failures.append((order[current.name], future.exception()))
+                else:
+                    finished.add(current.name)
+
+    if failures:
+        raise min(failures, key=lambda failure: failure[0])[1]
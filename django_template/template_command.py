@@ -1,13 +1,56 @@
 """Click command for 18f_django_template.py main function."""
 
+from pathlib import Path
+
 import click
 
-from .project_creator import ProjectCreator
+from .batch import load_spec, run_batch
+from .bulk_copy import COPY, LINK_MODES
+from .downloads import DEFAULT_TTL, DownloadCache
+from .output import ArchiveOutput, MemoryOutput
+from .profiling import Profiler
+from .project_creator import (
+    CACHE_BACKENDS,
+    RDS_PLANS,
+    SERVERS,
+    SESSION_BACKENDS,
+    ProjectCreator,
+    check_config,
+)
+
+
+class InteractiveOption(click.Option):
+    """An option that is prompted for, except when generating a batch.
+
+    In batch mode the options for each project come from the spec file, so
+    nothing is asked and unset options are left as None.
+    """
+
+    def prompt_for_value(self, ctx):
+        if ctx.params.get("batch") is not None:
+            return None
+        return super().prompt_for_value(ctx)
 
 
 @click.command()
+@click.option(
+    "--batch",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    # processed first so that nothing else prompts in batch mode
+    is_eager=True,
+    help="Generate every project listed in a YAML spec file",
+)
+@click.option(
+    "--processes",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Number of projects to generate at the same time with --batch "
+    "(default: number of CPUs)",
+)
 @click.option(
     "--app-name",
+    cls=InteractiveOption,
     default=None,
     type=str,
     show_default=False,
@@ -16,24 +59,66 @@ from .project_creator import ProjectCreator
 )
 @click.option(
     "--uswds/--no-uswds",
+    cls=InteractiveOption,
     prompt="Would you like to install USWDS (requires node to already be installed)",
     help="Use USWDS in the new application",
 )
+@click.option(
+    "--skip-node-if-cached",
+    is_flag=True,
+    help="Don't install node modules when compiled USWDS assets are cached",
+)
 @click.option(
     "--circleci/--no-circleci",
+    cls=InteractiveOption,
     prompt="Would you like to set up CircleCI for CI/CD",
     help="Configure CircleCI for the new application",
 )
 @click.option(
     "--github-actions/--no-github-actions",
+    cls=InteractiveOption,
     prompt="Would you like to set up Github Actions for CI/CD",
     help="Configure Github Actions for the new application",
 )
 @click.option(
     "--cloud-gov-terraform/--no-cloud-gov-terraform",
+    cls=InteractiveOption,
     prompt="Create terrform scripts for cloud.gov infrastructure",
     help="Configure Terraform for cloud.gov infrastructure",
 )
+@click.option(
+    "--cache-backend",
+    default="locmem",
+    type=click.Choice(CACHE_BACKENDS),
+    show_default=True,
+    help="Cache backend for the production settings",
+)
+@click.option(
+    "--session-backend",
+    default="db",
+    type=click.Choice(SESSION_BACKENDS),
+    show_default=True,
+    help="Where sessions are kept: cache backends need --cache-backend db or redis",
+)
+@click.option(
+    "--rds-plan",
+    default="micro-psql",
+    type=click.Choice(list(RDS_PLANS)),
+    show_default=True,
+    help="cloud.gov database plan, also used to size the connection pools",
+)
+@click.option(
+    "--server",
+    default="wsgi",
+    type=click.Choice(SERVERS),
+    show_default=True,
+    help="Serve the project with WSGI (gevent workers) or ASGI (uvicorn workers)",
+)
+@click.option(
+    "--jinja2/--no-jinja2",
+    default=False,
+    help="Add a Jinja2 template backend for heavy pages",
+)
 @click.option(
     "--cloud-gov-organization",
     default="ORGANIZATION",
@@ -49,27 +134,194 @@ from .project_creator import ProjectCreator
     default="prod",
     help="Cloud.gov space to use for production",
 )
+@click.option(
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Number of generation steps to run at the same time",
+)
+@click.option(
+    "--update",
+    is_flag=True,
+    help="Only rewrite files that changed since the project was generated",
+)
+@click.option(
+    "--profile",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write timing and I/O statistics for each step to a JSON file",
+)
+@click.option(
+    "--cprofile",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write cProfile data for the run to a file, for use with pstats "
+    "(only with --jobs 1)",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Only use cached or mirrored copies of remote files",
+)
+@click.option(
+    "--download-mirror",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="Local directory to look for remote files in before downloading them",
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Directory for cached downloads and templates (default ~/.cache/django-template)",
+)
+@click.option(
+    "--download-ttl",
+    default=DEFAULT_TTL,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="Seconds to use a cached download before checking it for changes",
+)
+@click.option(
+    "--link-files",
+    default=COPY,
+    type=click.Choice(LINK_MODES),
+    show_default=True,
+    help="How to copy files from the templates: reflinks share blocks "
+    "copy-on-write, hardlinks share the files themselves",
+)
+@click.option(
+    "--archive",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the project into a .tar.gz or .zip file instead of a directory",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="List the files that would be generated without writing anything",
+)
 def template_command(
+    batch,
+    processes,
     app_name,
     uswds,
+    skip_node_if_cached,
     circleci,
     github_actions,
     cloud_gov_terraform,
+    cache_backend,
+    session_backend,
+    rds_plan,
+    server,
+    jinja2,
     cloud_gov_organization,
     cloud_gov_staging_space,
     cloud_gov_production_space,
+    jobs,
+    update,
+    profile,
+    cprofile,
+    offline,
+    download_mirror,
+    cache_dir,
+    download_ttl,
+    link_files,
+    archive,
+    dry_run,
 ):
     """Run the command line script."""
     config = {
         "uswds": uswds,
+        "skip_node_if_cached": skip_node_if_cached,
         "circleci": circleci,
         "github_actions": github_actions,
         "cloud_gov_terraform": cloud_gov_terraform,
+        "cache_backend": cache_backend,
+        "session_backend": session_backend,
+        "rds_plan": rds_plan,
+        "server": server,
+        "jinja2": jinja2,
         "cloud_gov": {
             "organization": cloud_gov_organization,
             "staging_space": cloud_gov_staging_space,
             "production_space": cloud_gov_production_space,
         },
     }
-    ProjectCreator(dest_dir=app_name, config=config).run()
+    if batch is not None:
+        unsupported = {
+            "--archive": archive is not None,
+            "--dry-run": dry_run,
+            "--profile": profile is not None,
+            "--cprofile": cprofile is not None,
+        }
+        for flag, given in unsupported.items():
+            if given:
+                raise click.UsageError(f"{flag} can't be used with --batch")
+        # load_spec checks each project, after the spec's options are applied
+        _run_batch(
+            load_spec(batch, base_config=config),
+            processes=processes,
+            jobs=jobs,
+            cache_dir=cache_dir,
+            offline=offline,
+            download_mirror=download_mirror,
+            download_ttl=download_ttl,
+            update=update,
+            link=link_files,
+        )
+        return 0
+
+    check_config(config)
+    if cprofile is not None and jobs > 1:
+        raise click.BadParameter(
+            "can't be used with --jobs greater than 1", param_hint="--cprofile"
+        )
+    downloads = DownloadCache(
+        cache_dir=cache_dir, ttl=download_ttl, offline=offline, mirror=download_mirror
+    )
+    profiler = Profiler(cprofile=cprofile is not None)
+    output = None
+    if dry_run:
+        output = MemoryOutput()
+    elif archive is not None:
+        if not archive.endswith((".tar.gz", ".tgz", ".zip")):
+            raise click.BadParameter(
+                "must end with .tar.gz, .tgz or .zip", param_hint="--archive"
+            )
+        output = ArchiveOutput(archive, root=Path(app_name).name)
+    ProjectCreator(
+        dest_dir=app_name,
+        config=config,
+        downloads=downloads,
+        cache_dir=cache_dir,
+        update=update,
+        profiler=profiler,
+        output=output,
+        link=link_files,
+    ).run(jobs=jobs)
+    if dry_run:
+        for name, (data, mode) in sorted(output.files.items()):
+            click.echo(f"{mode:o} {len(data):8} {name}")
+    if profile is not None:
+        profiler.write_report(profile)
+    if cprofile is not None:
+        profiler.dump_cprofile(cprofile)
     return 0  # successful exit code
+
+
+def _run_batch(projects, **options):
+    """Generate a batch of projects and report how each one went."""
+    results = run_batch(projects, **options)
+    for result in results:
+        status = "ok" if result.succeeded else "FAILED"
+        click.echo(f"{status:6} {result.app_name} ({result.seconds:.1f}s)")
+        if not result.succeeded:
+            click.echo(result.error, err=True)
+
+    failures = [result for result in results if not result.succeeded]
+    if failures:
+        raise click.ClickException(
+            f"{len(failures)} of {len(results)} projects could not be generated"
+        )
@@ -0,0 +1,150 @@
+"""Index of our template files with compiled templates cached on disk."""
+
+import hashlib
+import os
+import stat
+import sys
+
+from pathlib import Path
+
+import jinja2
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from .cache import default_cache_dir
+
+
+class _MtimeBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache whose keys include the template file's mtime.
+
+    Jinja already discards bytecode whose source checksum doesn't match,
+    keying on the mtime as well means an edited template never even reads
+    the stale bytecode.
+    """
+
+    def __init__(self, directory, mtimes):
+        super().__init__(directory)
+        self.mtimes = mtimes
+
+    def get_cache_key(self, name, filename=None):
+        key = super().get_cache_key(name, filename)
+        mtime = self.mtimes.get(filename)
+        if mtime is None:
+            return key
+        return hashlib.sha1(f"{key}|{mtime}".encode("utf-8")).hexdigest()
+
+
+class TemplateFile:
+    """A file in our templates directory.
+
+    `template` is the compiled Jinja template, loaded the first time it is
+    needed.
+    """
+
+    def __init__(self, name, path, mode, mtime_ns, is_dir=False, size=0):
+        self.name = name
+        self.path = path
+        self.mode = mode
+        self.mtime_ns = mtime_ns
+        self.is_dir = is_dir
+        self.size = size
+        self.template = None
+        self._sha256 = None
+
+    @property
+    def sha256(self):
+        """The hash of the file's contents, computed the first time it is used."""
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+
+class TemplateIndex:
+    """All of the files in a templates directory, found with a single walk.
+
+    Templates are compiled once per index and the compiled bytecode is kept
+    in `cache_dir` so later runs don't need to parse them again. The cache
+    is namespaced by Jinja and Python version so upgrading either one
+    starts from a clean cache.
+    """
+
+    def __init__(self, templates_dir, globals=None, cache_dir=None):
+        self.templates_dir = Path(templates_dir)
+        self.files = {}
+        self._scan(self.templates_dir, "")
+
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        bytecode_dir = (
+            Path(cache_dir)
+            / "jinja"
+            / f"{jinja2.__version__}-{sys.implementation.cache_tag}"
+        )
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
+        mtimes = {
+            os.path.normpath(f.path): f.mtime_ns
+            for f in self.files.values()
+            if not f.is_dir
+        }
+
+        # our templates don't change during a run, so don't check them for
+        # changes every time they are used
+        self.environment = Environment(
+            loader=FileSystemLoader(self.templates_dir),
+            bytecode_cache=_MtimeBytecodeCache(str(bytecode_dir), mtimes),
+            auto_reload=False,
+            cache_size=-1,
+        )
+        if globals is not None:
+            self.environment.globals.update(globals)
+
+    def _scan(self, directory, prefix):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = prefix + entry.name
+                entry_stat = entry.stat()
+                is_dir = stat.S_ISDIR(entry_stat.st_mode)
+                self.files[name] = TemplateFile(
+                    name,
+                    Path(entry.path),
+                    entry_stat.st_mode,
+                    entry_stat.st_mtime_ns,
+                    is_dir=is_dir,
+                    size=entry_stat.st_size,
+                )
+                if is_dir:
+                    self._scan(entry.path, name + "/")
+
+    def __getitem__(self, name):
+        return self.files[str(Path(name).as_posix())]
+
+    def __contains__(self, name):
+        return str(Path(name).as_posix()) in self.files
+
+    def get_template(self, name):
+        """Return the compiled template for a file in the index."""
+        template_file = self[name]
+        if template_file.template is None:
+            template_file.template = self.environment.get_template(template_file.name)
+        return template_file.template
+
+    def walk(self, directory):
+        """Return the files and directories under directory, sorted by name."""
+        prefix = Path(directory).as_posix() + "/"
+        return [
+            self.files[name] for name in sorted(self.files) if name.startswith(prefix)
+        ]
+
+    def precompile(self):
+        """Compile every .jinja template now instead of on first use.
+
+        This fills the bytecode cache so that other processes using the same
+        cache directory don't need to compile anything.
+        """
+        for template_file in self.files.values():
+            if template_file.name.endswith(".jinja"):
+                self.get_template(template_file.name)
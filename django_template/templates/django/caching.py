@@ -0,0 +1,110 @@
+"""Helpers for caching the results of expensive code.
+
+Keys are versioned by namespace, so everything cached under a namespace
+can be thrown away at once with `invalidate`:
+
+    from .caching import cached_value, invalidate
+
+    def popular_pages():
+        return cached_value(
+            "pages", "popular", compute=lambda: list(Page.objects.popular())
+        )
+
+    # after pages change
+    invalidate("pages")
+
+`cached_value` also keeps a cache miss from turning into a stampede: when
+a value expires, only one process recomputes it while the others keep
+using the old value for a little longer.
+"""
+
+import time
+
+from django.core.cache import cache
+
+# how much longer than its timeout an expired value is kept around for
+# other processes to use while it is recomputed
+STALE_SECONDS = 60
+
+# how long one process may take to recompute a value before another one
+# is allowed to try
+LOCK_SECONDS = 30
+
+# how long to wait for another process to compute a value that isn't cached
+WAIT_SECONDS = 2
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def namespace_version(namespace):
+    """Return the current version of a namespace."""
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # start from the time so that a version is never reused after the
+        # version key itself is evicted
+        version = int(time.time())
+        if not cache.add(_version_key(namespace), version, timeout=None):
+            version = cache.get(_version_key(namespace), version)
+    return version
+
+
+def versioned_key(namespace, *parts):
+    """Return a cache key for parts that changes when namespace is invalidated."""
+    return ":".join(
+        [namespace, str(namespace_version(namespace)), *(str(p) for p in parts)]
+    )
+
+
+def invalidate(namespace):
+    """Stop using everything cached under namespace."""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        # nothing was cached under it
+        pass
+
+
+def _wait_for(key, seconds):
+    """Return the entry another process is computing for key, or None."""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cached_value(namespace, *parts, compute, timeout=300):
+    """Return the cached value for parts, computing it when needed.
+
+    Values are kept for `timeout` seconds, and for STALE_SECONDS after that
+    they are still returned to every process except the one that gets to
+    recompute them. When there is no value at all, the processes that don't
+    get to compute it wait up to WAIT_SECONDS for it before giving up and
+    computing it themselves.
+    """
+    key = versioned_key(namespace, *parts)
+    lock_key = f"{key}:lock"
+    entry = cache.get(key)
+    if entry is not None and time.time() < entry[1]:
+        return entry[0]
+
+    locked = cache.add(lock_key, 1, timeout=LOCK_SECONDS)
+    if not locked:
+        # somebody else is computing it already
+        if entry is not None:
+            return entry[0]
+        entry = _wait_for(key, WAIT_SECONDS)
+        if entry is not None:
+            return entry[0]
+
+    try:
+        value = compute()
+        cache.set(key, (value, time.time() + timeout), timeout=timeout + STALE_SECONDS)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
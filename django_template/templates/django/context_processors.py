@@ -0,0 +1,17 @@
+"""Template context that every page needs."""
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+
+def fragment_cache(request):
+    """What base.html keys its cached banner with.
+
+    The banner has links to static files, so it is cached per version of
+    the static files manifest (bin/build.sh makes a new one for every
+    deploy) as well as per language.
+    """
+    return {
+        "FRAGMENT_CACHE_SECONDS": settings.FRAGMENT_CACHE_SECONDS,
+        "STATIC_VERSION": getattr(staticfiles_storage, "manifest_hash", ""),
+    }
@@ -0,0 +1 @@
+"""Pooled PostgreSQL database backend, see base.py."""
@@ -0,0 +1,87 @@
+"""PostgreSQL backend that pools connections in each worker process.
+
+Under gunicorn's gevent worker every request runs in its own greenlet, and
+Django keeps one connection per greenlet, so persistent connections
+(CONN_MAX_AGE) would pile up and without them every request connects to
+Postgres again. With this backend Django still "closes" its connection at
+the end of each request, but the connection goes back to a bounded pool
+for the next request instead.
+
+Use it by setting ENGINE to this package and POOL to a dict with any of
+MAX_SIZE, TIMEOUT, MAX_AGE and CHECK_AFTER (see pool.ConnectionPool).
+"""
+
+import threading
+
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool, PoolTimeout
+
+try:
+    from gevent import monkey
+    from psycogreen.gevent import patch_psycopg
+except ImportError:
+    pass
+else:
+    if monkey.is_module_patched("socket"):
+        # let other greenlets run while psycopg2 waits for the database
+        patch_psycopg()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pools():
+    """Return the connection pools of this process by database alias."""
+    with _pools_lock:
+        return dict(_pools)
+
+
+def _is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.rollback()
+    except Exception:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _connection_pool(self):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                options = self.settings_dict.get("POOL", {})
+                pool = _pools[self.alias] = ConnectionPool(
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 10),
+                    max_age=options.get("MAX_AGE", 600),
+                    check_after=options.get("CHECK_AFTER", 30),
+                    is_usable=_is_usable,
+                )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self._connection_pool().get(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+            )
+        except PoolTimeout as error:
+            # so that Django raises it as an OperationalError
+            raise self.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        # Django keeps using self.connection when it's closed in an atomic
+        # block, until the block exits, so another greenlet mustn't get it
+        reusable = not connection.closed and not self.in_atomic_block
+        if reusable and connection.get_transaction_status() != 0:
+            # don't hand an open transaction to the next request
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+        _pools[self.alias].put(connection, reusable=reusable)
@@ -0,0 +1,133 @@
+"""A bounded pool of database connections for one worker process.
+
+The pool only uses `threading` and `queue`, which gunicorn's gevent worker
+monkeypatches, so waiting for a connection blocks just the greenlet that
+is waiting and not the whole worker.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# waits longer than this are logged, they mean the pool is too small
+SLOW_WAIT_SECONDS = 1.0
+
+
+class PoolTimeout(Exception):
+    """No connection became free in time."""
+
+
+class ConnectionPool:
+    """Up to `max_size` database connections.
+
+    Connections are reused most recently used first, and are closed instead
+    of reused once they are `max_age` seconds old. A connection that sat
+    idle for more than `check_after` seconds is checked with `is_usable`
+    before it is handed out.
+    """
+
+    def __init__(
+        self, max_size, timeout=10, max_age=600, check_after=30, is_usable=None
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check_after = check_after
+        self.is_usable = is_usable
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._created = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "connections_created": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, connect):
+        """Return a connection, waiting up to `timeout` seconds for one.
+
+        If there is no idle connection to reuse, `connect` is called to make
+        a new one.
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            self._count("waits")
+            acquired = self._slots.acquire(timeout=self.timeout)
+            waited = time.monotonic() - start
+            self._count("wait_seconds", waited)
+            if not acquired:
+                self._count("timeouts")
+                raise PoolTimeout(
+                    f"no database connection was free after {self.timeout}s"
+                )
+            if waited > SLOW_WAIT_SECONDS:
+                logger.warning("waited %.2fs for a database connection", waited)
+        try:
+            connection = self._reuse()
+            if connection is None:
+                connection = connect()
+                with self._lock:
+                    self._created[id(connection)] = time.monotonic()
+                    self._stats["connections_created"] += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        self._count("checkouts")
+        return connection
+
+    def _reuse(self):
+        """Return a usable idle connection, or None if there isn't one."""
+        now = time.monotonic()
+        while True:
+            try:
+                connection, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            created = self._created.get(id(connection), now)
+            if now - created > self.max_age:
+                self._close(connection)
+            elif (
+                now - returned_at > self.check_after
+                and self.is_usable is not None
+                and not self.is_usable(connection)
+            ):
+                self._close(connection)
+            else:
+                return connection
+
+    def put(self, connection, reusable=True):
+        """Give back a connection from get(), closing it unless reusable."""
+        try:
+            if reusable:
+                self._idle.put((connection, time.monotonic()))
+            else:
+                self._close(connection)
+        finally:
+            self._slots.release()
+
+    def _close(self, connection):
+        with self._lock:
+            self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Return counters describing how the pool has been used."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = len(self._created)
+        stats["idle"] = self._idle.qsize()
+        stats["max_size"] = self.max_size
+        return stats
@@ -0,0 +1,17 @@
+"""The environment of the Jinja2 template backend.
+
+Jinja2 compiles templates to Python and renders them several times faster
+than Django's templates, which helps pages that render large tables or
+loops. Put its templates in the jinja2 directory next to templates; Django
+looks for a template in templates first, then in jinja2.
+"""
+
+from django.templatetags.static import static
+from django.urls import reverse
+from jinja2 import Environment
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({"static": static, "url": reverse})
+    return env
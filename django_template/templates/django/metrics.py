@@ -0,0 +1,441 @@
+"""Request timing, as Server-Timing headers and Prometheus metrics.
+
+TimingMiddleware times every request, and the database queries, template
+rendering and cache lookups that it makes. With SERVER_TIMING enabled the
+times are sent in a `Server-Timing` header, which browsers show in their
+developer tools. With METRICS_ENABLED they are also added up per view and
+served at /metrics in Prometheus' text format.
+
+Every gunicorn worker has its own numbers. When METRICS_DIR is set, each
+worker writes its numbers to a file there every METRICS_WRITE_SECONDS, and
+/metrics adds up the files of every worker, live or gone, so it doesn't
+matter which worker answers the scrape.
+"""
+
+import contextvars
+import fcntl
+import hmac
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+# request durations, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# methods that get their own label, the rest are "other"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# the # HELP text of each metric
+HELP = {
+    "http_request_duration_seconds": "How long requests took.",
+    "db_queries_total": "Database queries made by requests.",
+    "db_query_seconds_total": "Time requests spent waiting on the database.",
+    "template_render_seconds_total": "Time requests spent rendering templates.",
+    "cache_lookups_total": "Cache lookups made by requests.",
+    "db_pool_open": "Connections in the database pool.",
+    "db_pool_idle": "Connections in the database pool that aren't in use.",
+    "db_pool_max_size": "The most connections the database pool holds.",
+}
+
+_request = contextvars.ContextVar("metrics_request")
+# set while a counted get_many() runs, which may go through get()
+_in_get_many = contextvars.ContextVar("metrics_in_get_many", default=False)
+_missing = object()
+
+
+class RequestTimes:
+    """What one request spent its time on."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Registry:
+    """Counters and histograms for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def dump(self):
+        """Return the values as something json can write."""
+        with self._lock:
+            return {
+                "counters": [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    [name, list(labels), buckets[:], total, count]
+                    for (name, labels), (
+                        buckets,
+                        total,
+                        count,
+                    ) in self.histograms.items()
+                ],
+            }
+
+    def merge(self, dumped):
+        """Add values from dump() to these."""
+        for name, labels, value in dumped["counters"]:
+            self.count(name, dict(labels), value)
+        for name, labels, buckets, total, count in dumped["histograms"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            with self._lock:
+                histogram = self.histograms.setdefault(
+                    key, [[0] * len(BUCKETS), 0.0, 0]
+                )
+                histogram[0] = [a + b for a, b in zip(histogram[0], buckets)]
+                histogram[1] += total
+                histogram[2] += count
+
+
+registry = Registry()
+
+
+def request_times():
+    """Return the RequestTimes of the request being handled, if it is timed."""
+    return _request.get(None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name, labels, value):
+    if not labels:
+        return f"{name} {value}"
+    rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{rendered}}} {value}"
+
+
+def _family(lines, families, name, kind):
+    # the # HELP and # TYPE lines go before the first sample of each metric
+    if name not in families:
+        families.add(name)
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def render(registry, gauges):
+    """Return the registry, and gauges by (name, labels), in Prometheus' text format."""
+    lines = []
+    families = set()
+    for (name, labels), value in sorted(registry.counters.items()):
+        _family(lines, families, name, "counter")
+        lines.append(_sample(name, labels, value))
+    for (name, labels), (buckets, total, count) in sorted(registry.histograms.items()):
+        _family(lines, families, name, "histogram")
+        for bound, bucket in zip(BUCKETS, buckets):
+            lines.append(_sample(f"{name}_bucket", [*labels, ("le", bound)], bucket))
+        lines.append(_sample(f"{name}_bucket", [*labels, ("le", "+Inf")], count))
+        lines.append(_sample(f"{name}_sum", labels, total))
+        lines.append(_sample(f"{name}_count", labels, count))
+    for (name, labels), value in sorted(gauges.items()):
+        _family(lines, families, name, "gauge")
+        lines.append(_sample(name, labels, value))
+    return "\n".join(lines) + "\n"
+
+
+def _pool_gauges():
+    """Return the database pool numbers of this process by (name, labels)."""
+    try:
+        from .db_pool.base import pools
+    except Exception:
+        return {}
+    gauges = {}
+    for alias, pool in pools().items():
+        for name, value in pool.stats().items():
+            gauges[(f"db_pool_{name}", (("database", alias),))] = value
+    return gauges
+
+
+def _dump_gauges(gauges):
+    return [[name, list(labels), value] for (name, labels), value in gauges.items()]
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class _Writer:
+    """Writes this process' numbers to METRICS_DIR now and then."""
+
+    def __init__(self):
+        self.written_at = 0.0
+
+    def maybe_write(self, force=False):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.written_at < settings.METRICS_WRITE_SECONDS:
+            return
+        self.written_at = now
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = Path(directory) / f"{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps(
+                {"registry": registry.dump(), "gauges": _dump_gauges(_pool_gauges())}
+            )
+        )
+        os.replace(temporary, path)
+
+
+_writer = _Writer()
+
+
+def _all_processes():
+    """Return the registries and gauges of every process added together.
+
+    The counts of workers that have exited are folded into gone.json, so
+    that they still count without a file per worker that ever ran.
+    """
+    directory = settings.METRICS_DIR
+    if not directory:
+        return registry, _pool_gauges()
+    _writer.maybe_write(force=True)
+    directory = Path(directory)
+    total = Registry()
+    gauges = {}
+    with open(directory / "lock", "w") as lock:
+        # one scrape at a time, so that a file isn't folded in twice
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        gone_path = directory / "gone.json"
+        gone = Registry()
+        if gone_path.exists():
+            gone.merge(json.loads(gone_path.read_text()))
+        folded = []
+        for path in directory.glob("*.json"):
+            if not path.stem.isdigit():
+                continue
+            try:
+                values = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # being replaced right now
+                continue
+            if _is_running(int(path.stem)):
+                total.merge(values["registry"])
+                for name, labels, value in values["gauges"]:
+                    key = (name, tuple(tuple(label) for label in labels))
+                    gauges[key] = gauges.get(key, 0) + value
+            else:
+                gone.merge(values["registry"])
+                folded.append(path)
+        if folded:
+            temporary = gone_path.with_suffix(".tmp")
+            temporary.write_text(json.dumps(gone.dump()))
+            os.replace(temporary, gone_path)
+            for path in folded:
+                path.unlink()
+        total.merge(gone.dump())
+    return total, gauges
+
+
+def _count_cache_lookups(cache):
+    """Count the hits and misses of a cache in the request's RequestTimes.
+
+    This instance's get() and get_many() are wrapped, get_or_set() goes
+    through get(). get_many() counts each key, and some backends' get_many()
+    calls get() for every key, so get() doesn't count while it runs.
+    Django makes an instance of each cache per thread, so this is called
+    for the caches of every request.
+    """
+    if getattr(cache, "_metrics_counted", False):
+        return
+    get = cache.get
+    get_many = cache.get_many
+
+    def counted_get(key, default=None, version=None):
+        value = get(key, _missing, version)
+        times = _request.get(None)
+        if times is not None and not _in_get_many.get():
+            if value is _missing:
+                times.cache_misses += 1
+            else:
+                times.cache_hits += 1
+        return default if value is _missing else value
+
+    def counted_get_many(keys, version=None):
+        keys = list(keys)
+        token = _in_get_many.set(True)
+        try:
+            values = get_many(keys, version=version)
+        finally:
+            _in_get_many.reset(token)
+        times = _request.get(None)
+        if times is not None:
+            times.cache_hits += len(values)
+            times.cache_misses += len(set(keys)) - len(values)
+        return values
+
+    cache.get = counted_get
+    cache.get_many = counted_get_many
+    cache._metrics_counted = True
+
+
+def _count_query(execute, sql, params, many, context):
+    times = _request.get(None)
+    if times is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        times.queries += 1
+        times.query_seconds += time.perf_counter() - start
+
+
+def _add_query_counter(connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class TimingMiddleware:
+    """Time requests, for Server-Timing headers and /metrics."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # the request being timed is found through a context variable, so
+        # queries are counted in whichever thread the ORM runs them
+        connection_created.connect(_add_query_counter, dispatch_uid=__name__)
+        for connection in connections.all(initialized_only=True):
+            _add_query_counter(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        self.count_cache_lookups()
+        times = RequestTimes()
+        token = _request.set(times)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, times, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        self.count_cache_lookups()
+        times = RequestTimes()
+        token = _request.set(times)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, times, time.perf_counter() - start)
+
+    @staticmethod
+    def count_cache_lookups():
+        for alias in settings.CACHES:
+            _count_cache_lookups(caches[alias])
+
+    def finish(self, request, response, times, seconds):
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = self.server_timing(times, seconds)
+        if settings.METRICS_ENABLED:
+            self.record(request, response, times, seconds)
+        return response
+
+    def process_template_response(self, request, response):
+        # the response is rendered right after this returns
+        times = _request.get(None)
+        if times is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                times.template_seconds += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def server_timing(times, seconds):
+        lookups = times.cache_hits + times.cache_misses
+        return ", ".join(
+            [
+                f'db;dur={times.query_seconds * 1000:.1f};desc="{times.queries} queries"',
+                f"template;dur={times.template_seconds * 1000:.1f}",
+                f'cache;desc="{times.cache_hits}/{lookups} hits"',
+                f"total;dur={seconds * 1000:.1f}",
+            ]
+        )
+
+    @staticmethod
+    def record(request, response, times, seconds):
+        match = request.resolver_match
+        labels = {"view": match.view_name if match else "unmatched"}
+        registry.observe(
+            "http_request_duration_seconds",
+            {
+                **labels,
+                "method": request.method if request.method in METHODS else "other",
+                "status": f"{response.status_code // 100}xx",
+            },
+            seconds,
+        )
+        registry.count("db_queries_total", labels, times.queries)
+        registry.count("db_query_seconds_total", labels, times.query_seconds)
+        registry.count("template_render_seconds_total", labels, times.template_seconds)
+        registry.count("cache_lookups_total", {"result": "hit"}, times.cache_hits)
+        registry.count("cache_lookups_total", {"result": "miss"}, times.cache_misses)
+        _writer.maybe_write()
+
+
+def metrics(request):
+    """Serve the metrics of every worker in Prometheus' text format."""
+    if not settings.METRICS_ENABLED:
+        raise Http404("metrics are disabled")
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if token and not hmac.compare_digest(authorization, f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        render(*_all_processes()),
+        content_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,185 @@
+"""How many database queries each view may make.
+
+nplusone catches lazy loading in loops, but not a view that slowly goes
+from 3 queries to 40 some other way. Give views a budget of queries, and
+optionally of milliseconds spent in the database:
+
+    from .query_budgets import budget, register
+
+    urlpatterns = [
+        path("pages/", budget(queries=3)(views.pages), name="pages"),
+    ]
+
+    # for views that can't be decorated, by URL name
+    register("admin:index", queries=5)
+
+QueryBudgetTestMixin requests every URL with a budget in a test and fails
+when one goes over, and in development QueryBudgetMiddleware logs a
+warning for every request that does.
+"""
+
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+
+from .metrics import request_times
+
+logger = logging.getLogger(__name__)
+
+# budgets by URL name, for views that can't be decorated
+budgets = {}
+
+
+class Budget:
+    """The most queries, and milliseconds in the database, a view may take."""
+
+    def __init__(self, queries, db_ms=None):
+        self.queries = queries
+        self.db_ms = db_ms
+
+    def overruns(self, queries, db_seconds):
+        """Return what went over this budget, as sentences."""
+        problems = []
+        if queries > self.queries:
+            problems.append(f"made {queries} queries, its budget is {self.queries}")
+        if self.db_ms is not None and db_seconds * 1000 > self.db_ms:
+            problems.append(
+                f"spent {db_seconds * 1000:.1f} ms in the database, "
+                f"its budget is {self.db_ms} ms"
+            )
+        return problems
+
+
+def budget(queries, db_ms=None):
+    """Decorate a view with a query budget."""
+
+    def decorator(view):
+        # set on the view itself, rather than wrapping it, so that async
+        # views stay async and cache_page() & co. copy it onto theirs
+        view.query_budget = Budget(queries, db_ms)
+        return view
+
+    return decorator
+
+
+def register(url_name, queries, db_ms=None):
+    """Give the view at a URL name a query budget."""
+    budgets[url_name] = Budget(queries, db_ms)
+
+
+def budget_for(view, url_name):
+    """Return the budget of a view, or None if it has none."""
+    return getattr(view, "query_budget", None) or budgets.get(url_name)
+
+
+def _url_patterns(patterns, namespace=""):
+    """Yield (URL name, view) for every named URL in patterns."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            inner = namespace
+            if pattern.namespace:
+                inner = f"{namespace}{pattern.namespace}:"
+            yield from _url_patterns(pattern.url_patterns, inner)
+        elif pattern.name:
+            yield f"{namespace}{pattern.name}", pattern.callback
+
+
+class QueryBudgetMiddleware:
+    """Log a warning for requests that go over their view's query budget.
+
+    The queries are counted by metrics.TimingMiddleware, so this must come
+    after it in MIDDLEWARE.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.check(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.check(request)
+        return response
+
+    @staticmethod
+    def check(request):
+        match = request.resolver_match
+        times = request_times()
+        if match is None or times is None:
+            return
+        view_budget = budget_for(match.func, match.view_name)
+        if view_budget is None:
+            return
+        for problem in view_budget.overruns(times.queries, times.query_seconds):
+            logger.warning("%s %s %s", match.view_name, request.path, problem)
+
+
+class QueryBudgetTestMixin:
+    """Test that every URL with a query budget stays within it.
+
+    Mix into a TestCase. URLs with arguments need them in
+    `query_budget_kwargs`, by URL name. Override `get_for_budget` to
+    request a URL differently, logged in for example.
+
+    setUp empties the cache that cache_page() uses, so that every view
+    really runs, which means that a subclass's setUp should call this one
+    before it logs in.
+    """
+
+    query_budget_kwargs = {}
+
+    def setUp(self):
+        super().setUp()
+        # cache_page() reads its timeout when urls.py is imported, so
+        # overriding CACHE_MIDDLEWARE_SECONDS can't turn it off
+        caches[settings.CACHE_MIDDLEWARE_ALIAS].clear()
+
+    def get_for_budget(self, url_name, url):
+        return self.client.get(url)
+
+    def test_query_budgets(self):
+        names = set()
+        for url_name, view in _url_patterns(get_resolver().url_patterns):
+            names.add(url_name)
+            view_budget = budget_for(view, url_name)
+            if view_budget is None:
+                continue
+            with self.subTest(url_name):
+                try:
+                    url = reverse(
+                        url_name, kwargs=self.query_budget_kwargs.get(url_name)
+                    )
+                except NoReverseMatch:
+                    self.fail(f"add the arguments of {url_name} to query_budget_kwargs")
+                with ExitStack() as stack:
+                    captures = [
+                        stack.enter_context(CaptureQueriesContext(connection))
+                        for connection in connections.all()
+                    ]
+                    response = self.get_for_budget(url_name, url)
+                self.assertLess(response.status_code, 500)
+                queries = [query for capture in captures for query in capture]
+                db_seconds = sum(float(query["time"]) for query in queries)
+                problems = view_budget.overruns(len(queries), db_seconds)
+                self.assertFalse(problems, f"{url_name} {'; '.join(problems)}")
+        for url_name in budgets.keys() - names:
+            self.fail(
+                f"a query budget is registered for {url_name}, no URL has that name"
+            )
@@ -0,0 +1,184 @@
+"""Logging that stays off the request path, for the production settings.
+
+Handlers write to stdout (and to disk) from a background thread: requests
+only put their records on a queue. Under gevent, which makes threads into
+greenlets, it is still an OS thread, so writing doesn't hold up the
+greenlets that serve requests. Records are written as one compact JSON
+object per line, which cloud.gov's log drain can search by field.
+"""
+
+import atexit
+import copy
+import importlib
+import json
+import logging
+import logging.handlers
+import os
+import random
+import sys
+import weakref
+
+try:
+    from gevent.monkey import get_original
+except ImportError:
+
+    def get_original(module_name, item_name):
+        return getattr(importlib.import_module(module_name), item_name)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Let through only `rate` of the records below `level`.
+
+    For loggers that can flood the logs, like 404s in django.request. Records
+    at `level` and above always get through.
+    """
+
+    def __init__(self, rate, level=logging.ERROR):
+        super().__init__()
+        self.rate = rate
+        if isinstance(level, str):
+            level = logging.getLevelName(level)
+        self.level = level
+
+    def filter(self, record):
+        return record.levelno >= self.level or random.random() < self.rate
+
+
+def _queue():
+    # a queue that an OS thread can wait on, also when gevent patched it
+    return get_original("queue", "SimpleQueue")()
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """A QueueListener whose thread is an OS thread under gevent too.
+
+    gevent patches threading.Thread, and what Thread starts threads with,
+    to make greenlets, so this starts one with the original _thread.
+    """
+
+    def start(self):
+        self._done = get_original("_thread", "allocate_lock")()
+        self._done.acquire()
+        get_original("_thread", "start_new_thread")(self._run, ())
+
+    def _run(self):
+        try:
+            self._monitor()
+        finally:
+            self._done.release()
+
+    def stop(self):
+        self.enqueue_sentinel()
+        with self._done:
+            pass
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Hand records to a thread that writes them to stdout, and to `file`.
+
+    `file` is opt-in and rotated after `max_bytes`. Since every gunicorn
+    worker has its own handler, `{pid}` in it is replaced by the process
+    ID, so that workers don't rotate each other's files.
+    """
+
+    def __init__(
+        self, file=None, max_bytes=10 * 1024 * 1024, backup_count=5, stream=None
+    ):
+        super().__init__(_queue())
+        self.file = file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.stream = stream
+        self.listener = None
+        self._start()
+        _queue_handlers.add(self)
+
+    def _handlers(self):
+        handlers = [logging.StreamHandler(self.stream or sys.stdout)]
+        if self.file:
+            handlers.append(
+                logging.handlers.RotatingFileHandler(
+                    self.file.format(pid=os.getpid()),
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backup_count,
+                    delay=True,
+                )
+            )
+        formatter = JsonFormatter()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
+
+    def _start(self):
+        self.queue = _queue()
+        self.listener = _QueueListener(
+            self.queue, *self._handlers(), respect_handler_level=True
+        )
+        self.listener.start()
+
+    def _after_fork(self):
+        if self.listener is not None:
+            self._start()
+
+    def _stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def drain(self):
+        """Wait until every record that was queued has been written."""
+        self._stop()
+        self._start()
+
+    def prepare(self, record):
+        # render the message and traceback now, while the objects they refer
+        # to can't change, but keep them apart for JsonFormatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def close(self):
+        self._stop()
+        _queue_handlers.discard(self)
+        super().close()
+
+
+# the handlers of this process, for the hooks below
+_queue_handlers = weakref.WeakSet()
+
+
+def _after_fork():
+    for handler in list(_queue_handlers):
+        handler._after_fork()
+
+
+def _stop_handlers():
+    for handler in list(_queue_handlers):
+        handler._stop()
+
+
+# threads don't survive fork, so gunicorn workers that were forked after the
+# settings were loaded need listeners of their own
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_stop_handlers)
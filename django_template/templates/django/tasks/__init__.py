@@ -0,0 +1,58 @@
+"""Background tasks, queued in Postgres and run by `manage.py run_worker`.
+
+Anything slow (emails, exports, calls to other services) can run outside
+of the request that asks for it:
+
+    from .tasks import task
+
+    @task(max_attempts=5)
+    def send_welcome_email(user_id):
+        ...
+
+    send_welcome_email.enqueue(user.pk)
+
+A task is a row in the same database as everything else, so it is only
+queued if the transaction that enqueues it commits, and no other broker
+is needed. Workers claim tasks a batch at a time with
+`SELECT ... FOR UPDATE SKIP LOCKED` (see worker.py), and retry the ones
+that fail after a growing delay. Arguments must be JSON serializable.
+"""
+
+
+class TaskFunction:
+    """A function that can be enqueued to run in a worker."""
+
+    def __init__(self, func, max_attempts, timeout):
+        self.func = func
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """Queue a call of this function with these arguments."""
+        from .models import Task
+
+        return Task.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=self.max_attempts,
+            timeout=self.timeout,
+        )
+
+
+def task(max_attempts=3, timeout=10 * 60):
+    """Make a function a task that is tried up to max_attempts times.
+
+    A worker that hasn't finished a task within timeout seconds is taken
+    to have stopped, and the task is run again.
+    """
+
+    def decorator(func):
+        return TaskFunction(func, max_attempts, timeout)
+
+    return decorator
@@ -0,0 +1,48 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from ...worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="how many tasks to run at once, each in its own thread",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5,
+            help="how many tasks each thread claims at a time",
+        )
+        parser.add_argument(
+            "--poll-seconds",
+            type=float,
+            default=1.0,
+            help="how long to wait when no tasks are due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="stop when no tasks are due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"],
+            batch_size=options["batch_size"],
+            poll_seconds=options["poll_seconds"],
+        )
+        if options["once"]:
+            worker.work(once=True)
+            return
+        # cloud.gov and docker stop processes with SIGTERM
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.start()
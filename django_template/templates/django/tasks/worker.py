@@ -0,0 +1,144 @@
+"""Claim queued tasks and run them.
+
+Each of a worker's threads claims a batch of tasks that are due in one
+transaction, with `SELECT ... FOR UPDATE SKIP LOCKED` so that workers
+never wait for each other or claim the same task, and then runs them one
+after the other. A task that raises is queued again after a delay that
+doubles with every attempt, until it has failed max_attempts times.
+"""
+
+import logging
+import random
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# the delay before the first retry, and the longest delay
+BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 60 * 60
+
+
+def backoff(attempts):
+    """Return how long to wait before trying a task again."""
+    seconds = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempts - 1))
+    # spread out the retries of tasks that failed together
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))  # nosec
+
+
+class Worker:
+    """Runs tasks from the queue in `concurrency` threads until stopped."""
+
+    def __init__(self, concurrency=1, batch_size=5, poll_seconds=1.0):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.stopping = threading.Event()
+
+    def claim(self):
+        """Return the next batch of tasks that are due, marked as running."""
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=Task.QUEUED, run_at__lte=now)
+                    # whoever was running these stopped before finishing
+                    | Q(status=Task.RUNNING, locked_until__lt=now)
+                )
+                .order_by("run_at")[: self.batch_size]
+            )
+            # the tasks in a batch run one after the other, so each one may
+            # have to wait for the timeouts of the ones before it
+            deadline = now
+            for claimed in tasks:
+                deadline += timedelta(seconds=claimed.timeout)
+                claimed.status = Task.RUNNING
+                claimed.locked_until = deadline
+                claimed.attempts += 1
+            Task.objects.bulk_update(tasks, ["status", "locked_until", "attempts"])
+        return tasks
+
+    def release(self, tasks):
+        """Queue claimed tasks again without counting the attempt."""
+        Task.objects.filter(pk__in=[queued.pk for queued in tasks]).update(
+            status=Task.QUEUED, locked_until=None, attempts=F("attempts") - 1
+        )
+
+    def run(self, claimed):
+        """Run a claimed task, and delete it, retry it or fail it."""
+        close_old_connections()
+        try:
+            if claimed.attempts > claimed.max_attempts:
+                raise RuntimeError("the worker running it stopped too many times")
+            import_string(claimed.name).func(*claimed.args, **claimed.kwargs)
+        except Exception:
+            claimed.last_error = traceback.format_exc()
+            if claimed.attempts < claimed.max_attempts:
+                claimed.status = Task.QUEUED
+                claimed.run_at = timezone.now() + backoff(claimed.attempts)
+                logger.warning(
+                    "task %s failed, will retry", claimed.name, exc_info=True
+                )
+            else:
+                claimed.status = Task.FAILED
+                logger.error("task %s failed for good", claimed.name, exc_info=True)
+            claimed.locked_until = None
+            claimed.save(
+                update_fields=["status", "run_at", "locked_until", "last_error"]
+            )
+        else:
+            claimed.delete()
+        finally:
+            close_old_connections()
+
+    def work_batch(self):
+        """Claim a batch of tasks and run them, and return whether there were any."""
+        tasks = self.claim()
+        for i, claimed in enumerate(tasks):
+            if self.stopping.is_set():
+                self.release(tasks[i:])
+                break
+            self.run(claimed)
+        return bool(tasks)
+
+    def work(self, once=False):
+        """Claim and run tasks until stopped, or with once, until none are due."""
+        while not self.stopping.is_set():
+            try:
+                ran = self.work_batch()
+            except DatabaseError:
+                if once:
+                    raise
+                # tasks left claimed are claimed again once their lock expires
+                logger.exception("lost the database, will try again")
+                ran = False
+            finally:
+                close_old_connections()
+            if not ran:
+                if once:
+                    return
+                self.stopping.wait(self.poll_seconds)
+
+    def start(self):
+        """Run work() in `concurrency` threads and wait for them to stop."""
+        threads = [
+            threading.Thread(target=self.work, name=f"worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self, *args):
+        """Finish the tasks that are running, and claim no more."""
+        self.stopping.set()
@@ -0,0 +1,80 @@
+"""Async views.
+
+Under ASGI these run on the worker's event loop, so a view that spends its
+time waiting (on another service, or for something to change) doesn't hold
+up the other requests the worker is serving. Blocking code must stay off
+the event loop: use the ORM's async methods (`aget`, `acount`, `async for`,
+...) and wrap everything else that touches the database, or does other
+blocking I/O, in `sync_to_async`.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, JsonResponse
+
+from .caching import namespace_version
+
+# how long the status checks may take
+STATUS_TIMEOUT_SECONDS = 5
+
+# caching.py namespaces that clients may wait for changes in
+WATCHED_NAMESPACES = {"pages"}
+
+# how long a long poll waits for a change before answering anyway, less
+# than the timeouts of the proxies in front of the app
+LONG_POLL_SECONDS = 25
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def _database_is_up():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+async def _cache_is_up():
+    await cache.aset("status", True, timeout=STATUS_TIMEOUT_SECONDS)
+    return await cache.aget("status", False)
+
+
+async def _check(awaitable):
+    try:
+        return await asyncio.wait_for(awaitable, STATUS_TIMEOUT_SECONDS)
+    except Exception:
+        return False
+
+
+async def status(request):
+    """Report whether the database and the cache work, checking both at once."""
+    database, cache_ = await asyncio.gather(
+        # Django's connections belong to a thread, so database code runs in
+        # the thread that sync_to_async keeps for this request
+        _check(sync_to_async(_database_is_up)()),
+        _check(_cache_is_up()),
+    )
+    return JsonResponse(
+        {"database": database, "cache": cache_},
+        status=200 if database and cache_ else 503,
+    )
+
+
+async def changes(request, namespace):
+    """Answer once namespace is invalidated, or after LONG_POLL_SECONDS.
+
+    Clients pass the version they have as `?version=` and get the current
+    one back.
+    """
+    if namespace not in WATCHED_NAMESPACES:
+        raise Http404(namespace)
+    get_version = sync_to_async(namespace_version)
+    since = request.GET.get("version")
+    version = await get_version(namespace)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LONG_POLL_SECONDS
+    while str(version) == since and loop.time() < deadline:
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        version = await get_version(namespace)
+    return JsonResponse({"version": version})
@@ -0,0 +1,11 @@
+"""Fixtures shared between test modules."""
+
+import pytest
+
+from .harness import make_mirror
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """A download mirror with every remote file, so no network is needed."""
+    yield make_mirror(tmp_path / "mirror")
@@ -0,0 +1,222 @@
+"""Generate, copy and serve projects for the integration tests.
+
+A project is generated once per test session into a snapshot directory,
+with its database already migrated, and every test gets its own copy of
+the snapshot. Projects are served by a local gunicorn (or Django's own
+server when gunicorn isn't installed) against SQLite, or against the
+database in $TEST_DATABASE_URL, and nothing here needs Docker.
+"""
+
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from contextlib import contextmanager
+from pathlib import Path
+
+from django_template.bulk_copy import REFLINK, copy_file
+from django_template.downloads import DownloadCache
+from django_template.project_creator import ProjectCreator
+
+APP_NAME = "testproj"
+
+CONFIG = {
+    "uswds": False,
+    "circleci": False,
+    "github_actions": False,
+    "cloud_gov_terraform": False,
+    "cloud_gov": {},
+}
+
+# the gunicorn worker that serves projects generated with server="asgi"
+ASGI_WORKER = "uvicorn_worker.UvicornWorker"
+
+# modules the generated project needs to run with its dev settings
+PROJECT_REQUIREMENTS = [
+    "django",
+    "dj_database_url",
+    "cfenv",
+    "debug_toolbar",
+    "nplusone",
+    "django_webtest",
+    "whitenoise",
+]
+
+
+class ServerNotReady(Exception):
+    """The server didn't start answering requests in time."""
+
+
+def make_mirror(mirror_dir):
+    """Make a download mirror with every remote file, so no network is needed."""
+    for url in ProjectCreator.remote_urls():
+        path = Path(mirror_dir) / url.split("://", 1)[1]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"mirrored {path.name}")
+    return mirror_dir
+
+
+def project_environment(project_dir):
+    """Return the environment to run the project's manage.py and servers in."""
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = f"{APP_NAME}.settings.dev"
+    env["DATABASE_URL"] = os.environ.get(
+        "TEST_DATABASE_URL", f"sqlite:///{Path(project_dir) / 'db.sqlite3'}"
+    )
+    env["ALLOWED_HOSTS"] = "127.0.0.1,localhost"
+    env["PYTHONUNBUFFERED"] = "yup"
+    # the project's gunicorn.conf.py defaults to gevent, which isn't needed here
+    env.setdefault("GUNICORN_WORKER_CLASS", "sync")
+    return env
+
+
+def manage(project_dir, *args):
+    """Run a manage.py command in the project and return its output."""
+    return subprocess.check_output(
+        [sys.executable, "manage.py", *args],
+        cwd=Path(project_dir) / APP_NAME,
+        env=project_environment(project_dir),
+        stderr=subprocess.STDOUT,
+        encoding="utf-8",
+    )
+
+
+def build_snapshot(root, server="wsgi"):
+    """Return a generated and migrated project under root, making it if needed.
+
+    Several pytest-xdist workers can call this at once. Each one that
+    finds no snapshot builds its own in a temporary directory and renames
+    it into place, and whoever loses the race uses the winner's snapshot.
+    """
+    snapshot = Path(root) / f"integration-snapshot-{server}"
+    if snapshot.is_dir():
+        return snapshot
+    staging = Path(tempfile.mkdtemp(dir=root, prefix=".snapshot."))
+    try:
+        project_dir = staging / APP_NAME
+        creator = ProjectCreator(
+            project_dir,
+            config=dict(CONFIG, server=server),
+            downloads=DownloadCache(
+                cache_dir=staging / "cache",
+                mirror=make_mirror(staging / "mirror"),
+            ),
+            cache_dir=staging / "cache",
+        )
+        creator.run()
+        manage(project_dir, "migrate", "--noinput")
+        try:
+            os.rename(project_dir, snapshot)
+        except OSError:
+            if not snapshot.is_dir():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return snapshot
+
+
+def copy_snapshot(snapshot, destination):
+    """Copy a snapshot so that a test can change it freely."""
+    shutil.copytree(
+        snapshot,
+        destination,
+        symlinks=True,
+        copy_function=lambda src, dst: copy_file(src, dst, link=REFLINK),
+    )
+    return destination
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, timeout=30, first_delay=0.05, max_delay=1.0, process=None):
+    """Poll url until the server answers, backing off between attempts.
+
+    Any HTTP response counts as ready, even an error. Raises ServerNotReady
+    if nothing answers within timeout seconds, or if `process` exits first.
+    """
+    deadline = time.monotonic() + timeout
+    delay = first_delay
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=max_delay):
+                return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            pass
+        if process is not None and process.poll() is not None:
+            raise ServerNotReady(f"server exited with {process.returncode}")
+        if time.monotonic() + delay > deadline:
+            raise ServerNotReady(f"{url} did not answer within {timeout}s")
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+def server_command(port, server="wsgi"):
+    """Return the command that serves the project on port."""
+    if server == "asgi":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            "1",
+            "--worker-class",
+            ASGI_WORKER,
+            f"{APP_NAME}.asgi:application",
+        ]
+    if importlib.util.find_spec("gunicorn") is not None:
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            "1",
+            f"{APP_NAME}.wsgi:application",
+        ]
+    return [
+        sys.executable,
+        "manage.py",
+        "runserver",
+        "--noreload",
+        f"127.0.0.1:{port}",
+    ]
+
+
+@contextmanager
+def serve(project_dir, readiness_path="/", server="wsgi"):
+    """Serve the project while the context is active and yield its base URL."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        server_command(port, server),
+        cwd=Path(project_dir) / APP_NAME,
+        env=project_environment(project_dir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url + readiness_path, process=process)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,80 @@
+"""Test the cache of compiled USWDS assets."""
+
+from django_template.assets import AssetBundleCache
+from django_template.output import MemoryOutput
+from django_template.project_creator import ProjectCreator
+
+
+def _make_assets(static_dir):
+    (static_dir / "css").mkdir(parents=True, exist_ok=True)
+    (static_dir / "css" / "styles.css").write_text("body {}")
+    (static_dir / "img" / "usa-icons").mkdir(parents=True, exist_ok=True)
+    (static_dir / "img" / "usa-icons" / "flag.svg").write_text("<svg/>")
+
+
+def test_store_and_load(tmp_path):
+    cache = AssetBundleCache(tmp_path / "cache")
+    key = cache.key(b"lockfile", b"gulpfile")
+    assert cache.load(key) is None
+
+    _make_assets(tmp_path / "static")
+    (tmp_path / "static" / ".gitkeep").touch()
+    cache.store(key, tmp_path / "static")
+    assert cache.has(key)
+    assert cache.load(key) == {
+        "css/styles.css": b"body {}",
+        "img/usa-icons/flag.svg": b"<svg/>",
+    }
+    assert cache.load(cache.key(b"lockfile", b"other gulpfile")) is None
+
+
+def test_corrupted_bundle_is_discarded(tmp_path):
+    cache = AssetBundleCache(tmp_path / "cache")
+    key = cache.key(b"inputs")
+    _make_assets(tmp_path / "static")
+    cache.store(key, tmp_path / "static")
+    (cache.cache_dir / key / "css" / "styles.css").write_text("tampered")
+    assert cache.load(key) is None
+    assert not cache.has(key)
+
+
+def _creator(tmp_path, name, commands, **kwargs):
+    config = {"uswds": True, "cloud_gov": {}}
+    creator = ProjectCreator(
+        tmp_path / name, config=config, cache_dir=tmp_path / "cache", **kwargs
+    )
+
+    def exec_in_destination(command):
+        commands.append(command)
+        _make_assets(creator.dest_dir / creator.app_name / creator.app_name / "static")
+
+    creator.exec_in_destination = exec_in_destination
+    return creator
+
+
+def test_assets_reused_between_projects(tmp_path):
+    commands = []
+    _creator(tmp_path, "first", commands).set_up_uswds_templates()
+    assert commands == [["npx", "gulp", "init"], ["npx", "gulp", "compile"]]
+
+    second = _creator(tmp_path, "second", commands)
+    second.set_up_uswds_templates()
+    assert len(commands) == 2
+    static_dir = second.dest_dir / "second" / "second" / "static"
+    assert (static_dir / "css" / "styles.css").read_text() == "body {}"
+
+    # outputs that can't run gulp get the cached assets too
+    output = MemoryOutput()
+    _creator(tmp_path, "third", commands, output=output).set_up_uswds_templates()
+    assert output.files["third/third/static/css/styles.css"][0] == b"body {}"
+
+
+def test_skip_node_if_cached(tmp_path):
+    commands = []
+    _creator(tmp_path, "first", commands).set_up_uswds_templates()
+    creator = _creator(tmp_path, "second", commands)
+    creator.config["skip_node_if_cached"] = True
+    creator.set_up_npm()
+    assert len(commands) == 2
+    assert not (creator.dest_dir / "node_modules").exists()
+    assert (creator.dest_dir / "package-lock.json").exists()
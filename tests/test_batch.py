@@ -0,0 +1,144 @@
+"""Test generating a batch of projects."""
+
+import pytest
+
+from click import ClickException
+
+from django_template import template_command
+from django_template.batch import load_spec, run_batch
+
+
+def test_load_spec(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text("""
+defaults:
+  github_actions: true
+  cloud_gov:
+    organization: my-org
+projects:
+  - app_name: first
+  - app_name: second
+    github_actions: false
+    cloud_gov:
+      staging_space: dev
+""")
+    projects = load_spec(spec, base_config={"cloud_gov": {"staging_space": "staging"}})
+    assert projects == [
+        (
+            "first",
+            {
+                "github_actions": True,
+                "cloud_gov": {"organization": "my-org", "staging_space": "staging"},
+            },
+        ),
+        (
+            "second",
+            {
+                "github_actions": False,
+                "cloud_gov": {"organization": "my-org", "staging_space": "dev"},
+            },
+        ),
+    ]
+
+
+def test_load_spec_needs_app_names(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text("projects:\n  - uswds: true\n")
+    with pytest.raises(ClickException):
+        load_spec(spec)
+
+
+@pytest.mark.parametrize(
+    "project, message",
+    [
+        ("rds_plan: huge-psql", "--rds-plan"),
+        ("server: cgi", "--server"),
+        ("session_backend: cache", "--cache-backend db or redis"),
+    ],
+)
+def test_load_spec_checks_projects(tmp_path, project, message):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(
+        f"projects:\n  - app_name: first\n  - app_name: bad\n    {project}\n"
+    )
+    with pytest.raises(ClickException, match=message) as error:
+        load_spec(spec)
+    assert "bad in" in error.value.message
+
+
+def test_load_spec_checks_merged_options(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(
+        "defaults:\n  cache_backend: redis\nprojects:\n  - app_name: first\n"
+    )
+    # the spec's defaults give the sessions a shared cache
+    projects = load_spec(spec, base_config={"session_backend": "cache"})
+    assert projects[0][1]["session_backend"] == "cache"
+
+
+def test_run_batch(tmp_path, mirror):
+    projects = [(str(tmp_path / name), {"uswds": False}) for name in ["one", "two"]]
+    results = run_batch(
+        projects,
+        processes=2,
+        cache_dir=tmp_path / "cache",
+        offline=True,
+        download_mirror=mirror,
+    )
+    assert [result.succeeded for result in results] == [True, True]
+    for name in ["one", "two"]:
+        assert (tmp_path / name / name / "manage.py").exists()
+        assert (tmp_path / name / "LICENSE.md").read_text() == "mirrored LICENSE.md"
+
+
+def test_run_batch_reports_failures(tmp_path, mirror):
+    # a file is in the way of the destination directory
+    (tmp_path / "blocked").write_text("")
+    projects = [
+        (str(tmp_path / "blocked"), {"uswds": False}),
+        (str(tmp_path / "fine"), {"uswds": False}),
+    ]
+    results = run_batch(
+        projects, cache_dir=tmp_path / "cache", offline=True, download_mirror=mirror
+    )
+    assert not results[0].succeeded
+    assert "FileExistsError" in results[0].error
+    assert results[1].succeeded
+
+
+def test_run_batch_needs_downloads(tmp_path):
+    projects = [(str(tmp_path / "offline"), {"uswds": False})]
+    # nothing is cached and we can't download anything
+    with pytest.raises(ClickException):
+        run_batch(projects, cache_dir=tmp_path / "cache", offline=True)
+
+
+def test_batch_command_does_not_prompt(cli_runner, tmp_path, mirror):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(f"projects:\n  - app_name: {tmp_path / 'batched'}\n")
+    result = cli_runner.invoke(
+        template_command,
+        [
+            f"--batch={spec}",
+            "--offline",
+            f"--download-mirror={mirror}",
+            f"--cache-dir={tmp_path / 'cache'}",
+        ],
+        input="",
+    )
+    assert result.exit_code == 0, result.output
+    assert "ok" in result.output
+    assert (tmp_path / "batched" / "batched" / "manage.py").exists()
+
+
+@pytest.mark.parametrize(
+    "option",
+    ["--archive=out.zip", "--dry-run", "--profile=out.json", "--cprofile=out.prof"],
+)
+def test_batch_command_refuses_options(cli_runner, tmp_path, option):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(f"projects:\n  - app_name: {tmp_path / 'batched'}\n")
+    result = cli_runner.invoke(template_command, [f"--batch={spec}", option], input="")
+    assert result.exit_code == 2
+    assert "can't be used with --batch" in result.output
+    assert not (tmp_path / "batched").exists()
@@ -0,0 +1,82 @@
+"""Benchmarks for project generation.
+
+These use pytest-benchmark. To keep track of generation times across
+releases, save a baseline with `pytest tests/test_benchmark.py
+--benchmark-autosave` and compare later runs against it with
+`--benchmark-compare`.
+"""
+
+import itertools
+
+import pytest
+
+from django_template.downloads import DownloadCache
+from django_template.project_creator import TEMPLATES_DIR, ProjectCreator
+from django_template.template_index import TemplateIndex
+
+pytest.importorskip("pytest_benchmark")
+
+CONFIG = {
+    "uswds": False,
+    "circleci": True,
+    "github_actions": True,
+    "cloud_gov_terraform": True,
+    "cloud_gov": {
+        "organization": "ORGANIZATION",
+        "staging_space": "staging",
+        "production_space": "prod",
+    },
+}
+
+
+@pytest.fixture
+def make_creator(tmp_path, mirror):
+    """Return a function that makes a ProjectCreator in a new directory."""
+    counter = itertools.count()
+    cache_dir = tmp_path / "cache"
+
+    def make():
+        downloads = DownloadCache(cache_dir=cache_dir, mirror=mirror)
+        return ProjectCreator(
+            tmp_path / f"project{next(counter)}",
+            config=dict(CONFIG),
+            downloads=downloads,
+            cache_dir=cache_dir,
+        )
+
+    yield make
+
+
+def test_full_generation(benchmark, make_creator):
+    benchmark.pedantic(
+        lambda creator: creator.run(), setup=lambda: ((make_creator(),), {}), rounds=5
+    )
+
+
+def test_full_generation_concurrent(benchmark, make_creator):
+    benchmark.pedantic(
+        lambda creator: creator.run(jobs=4),
+        setup=lambda: ((make_creator(),), {}),
+        rounds=5,
+    )
+
+
+def test_template_index(benchmark, tmp_path):
+    benchmark(TemplateIndex, TEMPLATES_DIR, cache_dir=tmp_path / "cache")
+
+
+@pytest.mark.parametrize(
+    "step_name",
+    [
+        "create_django_app",
+        "set_up_circleci",
+        "set_up_github_actions",
+        "set_up_terraform",
+    ],
+)
+def test_step(benchmark, make_creator, step_name):
+    benchmark.pedantic(
+        lambda creator: getattr(creator, step_name)(),
+        setup=lambda: ((make_creator(),), {}),
+        rounds=10,
+    )
@@ -0,0 +1,76 @@
+"""Test copying files with the kernel's help."""
+
+import errno
+import os
+
+import pytest
+
+from django_template import bulk_copy
+from django_template.bulk_copy import COPY, HARDLINK, REFLINK, copy_file
+from django_template.project_creator import ProjectCreator
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source"
+    path.write_bytes(b"x" * 100_000)
+    path.chmod(0o755)
+    return path
+
+
+@pytest.mark.parametrize("link", [COPY, REFLINK])
+def test_copy_file(tmp_path, source, link):
+    destination = tmp_path / "destination"
+    copy_file(source, destination, 0o640, link=link)
+    assert destination.read_bytes() == source.read_bytes()
+    assert destination.stat().st_mode & 0o777 == 0o640
+    assert not os.path.samefile(source, destination)
+
+
+def test_copy_file_keeps_source_mode(tmp_path, source):
+    copy_file(source, tmp_path / "destination")
+    assert (tmp_path / "destination").stat().st_mode & 0o777 == 0o755
+
+
+def test_hardlink(tmp_path, source):
+    destination = tmp_path / "destination"
+    destination.write_text("old")
+    copy_file(source, destination, link=HARDLINK)
+    assert os.path.samefile(source, destination)
+
+
+def test_copy_replaces_hardlink(tmp_path, source):
+    destination = tmp_path / "destination"
+    os.link(source, destination)
+    other = tmp_path / "other"
+    other.write_text("new")
+    copy_file(other, destination)
+    assert destination.read_text() == "new"
+    # the file it used to be linked to is untouched
+    assert source.read_bytes() == b"x" * 100_000
+
+
+def _unsupported(*args):
+    raise OSError(errno.ENOSYS, "not here")
+
+
+def test_fallbacks(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(bulk_copy, "_copy_file_range", _unsupported)
+    copy_file(source, tmp_path / "sendfile")
+    assert (tmp_path / "sendfile").read_bytes() == source.read_bytes()
+
+    monkeypatch.setattr(bulk_copy, "_sendfile", _unsupported)
+    copy_file(source, tmp_path / "read_write")
+    assert (tmp_path / "read_write").read_bytes() == source.read_bytes()
+
+
+def test_creator_copies_directories(tmp_path):
+    creator = ProjectCreator(tmp_path, config={"cloud_gov": {}})
+    creator._copy_directory_with_templates("terraform", "terraform")
+    for template_file in creator.template_index.walk("terraform"):
+        if template_file.is_dir or template_file.name.endswith(".jinja"):
+            continue
+        copied = creator.dest_dir / template_file.name
+        assert copied.read_bytes() == template_file.path.read_bytes()
+        assert copied.stat().st_mode == template_file.mode
+        assert creator.manifest.files[template_file.name] == template_file.sha256
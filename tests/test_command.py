@@ -26,3 +26,21 @@ def test_all_options(cli_runner):
     assert result.exit_code == 0
     assert "given-name" in result.output
     assert "given_name" in result.output
+
+
+def test_cached_sessions_need_a_shared_cache(cli_runner):
+    """Sessions in a per-process cache are refused."""
+    result = cli_runner.invoke(
+        template_command,
+        [
+            "--app-name=given-name",
+            "--no-uswds",
+            "--no-circleci",
+            "--no-github-actions",
+            "--no-cloud-gov-terraform",
+            "--session-backend=cached_db",
+        ],
+        input="",
+    )
+    assert result.exit_code == 2
+    assert "--cache-backend db or redis" in result.output
@@ -28,29 +28,6 @@ def test_ensure_path_exists_absolute(tmp_path):
     assert (tmp_path.resolve() / "subdirectory").exists()
 
 
-def test_re_sub_file(tmp_path):
-    creator = ProjectCreator(tmp_path, config={})
-    test_file = creator.dest_dir / "test_file"
-    with open(test_file, "w") as f:
-        f.write("Line 1")
-    creator.re_sub_file(test_file, r"(\d)$", r"\1\1")
-    with open(test_file, "r") as f:
-        content = f.read()
-    assert "11" in content
-
-
-def test_re_sub_file_multiline(tmp_path):
-    creator = ProjectCreator(tmp_path, config={})
-    test_file = creator.dest_dir / "test_file"
-    with open(test_file, "w") as f:
-        f.write("Line 1\nLine2")
-    creator.re_sub_file(test_file, r"(\d)$", r"\1\1")
-    with open(test_file, "r") as f:
-        content = f.read()
-    assert "11" in content
-    assert "22" in content
-
-
 def test_templated_directory(tmp_path):
     creator = ProjectCreator(tmp_path, config={})
     creator._copy_directory_with_templates("githooks", ".githooks")
@@ -69,3 +46,14 @@ def test_templated_subdirectories(tmp_path):
     assert (creator.dest_dir / ".github").is_dir()
     assert (creator.dest_dir / ".github" / "actions").exists()
     assert (creator.dest_dir / ".github" / "actions").is_dir()
+
+
+def test_settings_directory_leaves_settings_py(tmp_path):
+    creator = ProjectCreator(tmp_path, config={})
+    app_dir = creator.dest_dir / creator.app_name / creator.app_name
+    app_dir.mkdir(parents=True)
+    (app_dir / "settings.py").write_text("SECRET_KEY = 'edited'\n")
+    creator._make_settings_directory()
+    # we never generate a settings.py, so one that is there is the user's
+    assert (app_dir / "settings.py").read_text() == "SECRET_KEY = 'edited'\n"
+    assert not (app_dir / "settings" / "base.py").exists()
@@ -0,0 +1,121 @@
+"""Test the download cache."""
+
+import pytest
+
+from requests import ConnectionError
+
+from django_template.downloads import DownloadCache, DownloadError
+
+URL = "https://example.com/files/LICENSE.md"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ConnectionError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Stand-in for requests.Session that records the requests made."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def test_download_is_cached(tmp_path):
+    session = FakeSession(FakeResponse(content=b"license", headers={"ETag": '"v1"'}))
+    cache = DownloadCache(cache_dir=tmp_path, session=session)
+    assert cache.fetch(URL) == b"license"
+    # second fetch is served from the cache without a request
+    assert cache.fetch(URL) == b"license"
+    assert len(session.requests) == 1
+
+
+def test_cache_shared_between_instances(tmp_path):
+    DownloadCache(
+        cache_dir=tmp_path, session=FakeSession(FakeResponse(content=b"license"))
+    ).fetch(URL)
+    session = FakeSession()
+    assert DownloadCache(cache_dir=tmp_path, session=session).fetch(URL) == b"license"
+    assert session.requests == []
+
+
+def test_expired_entry_is_revalidated(tmp_path):
+    session = FakeSession(
+        FakeResponse(
+            content=b"license",
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        ),
+        FakeResponse(status_code=304),
+    )
+    cache = DownloadCache(cache_dir=tmp_path, ttl=0, session=session)
+    cache.fetch(URL)
+    assert cache.fetch(URL) == b"license"
+    _, headers = session.requests[1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def test_expired_entry_is_replaced(tmp_path):
+    session = FakeSession(
+        FakeResponse(content=b"old"),
+        FakeResponse(content=b"new"),
+    )
+    cache = DownloadCache(cache_dir=tmp_path, ttl=0, session=session)
+    assert cache.fetch(URL) == b"old"
+    assert cache.fetch(URL) == b"new"
+
+
+def test_stale_entry_used_when_network_fails(tmp_path):
+    session = FakeSession(FakeResponse(content=b"license"), ConnectionError("down"))
+    cache = DownloadCache(cache_dir=tmp_path, ttl=0, session=session)
+    cache.fetch(URL)
+    assert cache.fetch(URL) == b"license"
+
+
+def test_network_failure_without_cache(tmp_path):
+    session = FakeSession(ConnectionError("down"))
+    cache = DownloadCache(cache_dir=tmp_path, session=session)
+    with pytest.raises(DownloadError):
+        cache.fetch(URL)
+
+
+def test_offline_uses_expired_cache(tmp_path):
+    DownloadCache(
+        cache_dir=tmp_path, session=FakeSession(FakeResponse(content=b"license"))
+    ).fetch(URL)
+    session = FakeSession()
+    cache = DownloadCache(cache_dir=tmp_path, ttl=0, offline=True, session=session)
+    assert cache.fetch(URL) == b"license"
+    assert session.requests == []
+
+
+def test_offline_cache_miss(tmp_path):
+    cache = DownloadCache(cache_dir=tmp_path, offline=True, session=FakeSession())
+    with pytest.raises(DownloadError):
+        cache.fetch(URL)
+
+
+def test_mirror(tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "example.com" / "files").mkdir(parents=True)
+    (mirror / "example.com" / "files" / "LICENSE.md").write_bytes(b"mirrored")
+    session = FakeSession()
+    cache = DownloadCache(
+        cache_dir=tmp_path / "cache", offline=True, mirror=mirror, session=session
+    )
+    assert cache.fetch(URL) == b"mirrored"
+    assert session.requests == []
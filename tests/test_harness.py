@@ -0,0 +1,35 @@
+"""Test the readiness polling used by the integration tests."""
+
+import http.server
+import threading
+import time
+
+import pytest
+
+from .harness import ServerNotReady, free_port, wait_until_ready
+
+
+def test_wait_until_ready_after_late_start():
+    port = free_port()
+    server = http.server.HTTPServer(
+        ("127.0.0.1", port), http.server.SimpleHTTPRequestHandler
+    )
+
+    def serve_later():
+        time.sleep(0.3)
+        server.serve_forever()
+
+    thread = threading.Thread(target=serve_later, daemon=True)
+    thread.start()
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}/", timeout=10)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_wait_until_ready_times_out():
+    start = time.monotonic()
+    with pytest.raises(ServerNotReady):
+        wait_until_ready(f"http://127.0.0.1:{free_port()}/", timeout=0.5)
+    assert time.monotonic() - start < 5
@@ -1,7 +1,11 @@
 """Test the resulting project for correctness."""
 
+import json
+import os
 import subprocess
-import time
+import sys
+import urllib.error
+import urllib.request
 
 from contextlib import contextmanager
 from subprocess import CalledProcessError
@@ -10,22 +14,110 @@ import pytest
 
 from django_template.project_creator import ProjectCreator
 
+from .harness import (
+    APP_NAME,
+    PROJECT_REQUIREMENTS,
+    build_snapshot,
+    copy_snapshot,
+    manage,
+    project_environment,
+    serve,
+    wait_until_ready,
+)
 
-@pytest.fixture(scope="module")
-def project(tmp_path_factory):
-    this_dir = tmp_path_factory.mktemp("test-proj")
-    creator = ProjectCreator(this_dir, config={"uswds": True})
-    # run the entire creation process
-    creator.run()
 
-    # have to manually pipenv install
-    creator.exec_in_destination(["pipenv", "install"])
+@pytest.fixture(scope="session")
+def snapshot(tmp_path_factory):
+    """A generated and migrated project, made once for the whole session."""
+    for module in PROJECT_REQUIREMENTS:
+        pytest.importorskip(module)
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        # every worker has its own basetemp, share the snapshot between them
+        root = root.parent
+    return build_snapshot(root)
+
+
+@pytest.fixture
+def project(snapshot, tmp_path):
+    """A copy of the snapshot that this test can change."""
+    return copy_snapshot(snapshot, tmp_path / APP_NAME)
+
+
+@pytest.fixture
+def live_server(project):
+    with serve(project) as base_url:
+        yield base_url
+
+
+def test_project_tests(project):
+    """The generated project's own tests pass."""
+    manage(project, "test")
+
+
+def test_page_load(live_server):
+    """Can load the home page."""
+    with urllib.request.urlopen(live_server + "/") as response:
+        assert response.status == 200
+
+
+def test_load_test(project):
+    """The project's load test serves requests and reports their latencies."""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-m",
+            f"{APP_NAME}.loadtest",
+            "--duration",
+            "1",
+            "--warmup",
+            "0",
+        ]
+        + ["--concurrency", "2", "--workers", "1"],
+        cwd=project / APP_NAME,
+        env=project_environment(project),
+        encoding="utf-8",
+    )
+    total = json.loads(output)["total"]
+    assert total["requests"] > 0
+    assert total["errors"] == 0
+    assert total["p99_ms"] >= total["p50_ms"]
 
-    # Try building the docker images here to make the later tests more
-    # reliable.
-    creator.exec_in_destination(["docker", "compose", "build"])
 
-    yield creator
+@pytest.fixture(scope="session")
+def asgi_snapshot(tmp_path_factory):
+    """Like snapshot, for a project served with ASGI."""
+    for module in [*PROJECT_REQUIREMENTS, "uvicorn_worker"]:
+        pytest.importorskip(module)
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        root = root.parent
+    return build_snapshot(root, server="asgi")
+
+
+@pytest.fixture
+def asgi_project(asgi_snapshot, tmp_path):
+    return copy_snapshot(asgi_snapshot, tmp_path / APP_NAME)
+
+
+def test_asgi_project_tests(asgi_project):
+    """The tests of a project served with ASGI, and its async views, pass."""
+    manage(asgi_project, "test")
+
+
+def test_asgi_status(asgi_project):
+    """The async status view answers under gunicorn's uvicorn worker."""
+    with serve(asgi_project, server="asgi") as base_url:
+        with urllib.request.urlopen(base_url + "/status/") as response:
+            assert response.status == 200
+            assert json.load(response) == {"database": True, "cache": True}
+
+
+def test_nonexistent_page(live_server):
+    """Loading a non-existent page gives an HTTP error code."""
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(live_server + "/not/a/valid/url")
+    assert error.value.code == 404
 
 
 def _check_docker_running():
@@ -34,7 +126,8 @@ def _check_docker_running():
         output = subprocess.check_output(
             ["docker", "info", "-f", "{{json .ServerErrors}}"]
         )
-    except CalledProcessError:
+    except (CalledProcessError, OSError):
+        # not running, or not even installed
         return False
 
     # output is bytes, so need to decode it lossily into a string
@@ -46,23 +139,34 @@ def _check_docker_running():
 
 
 docker_is_running = pytest.mark.skipif(
-    not _check_docker_running(), reason="Docker must be running for integration tests"
+    not _check_docker_running(), reason="Docker must be running for docker tests"
 )
 
 
-@docker_is_running
-def test_docker_compose_build(project):
-    """Can run docker_compose build."""
-    project.exec_in_destination(["docker", "compose", "build"])
+@pytest.fixture(scope="module")
+def docker_project(tmp_path_factory):
+    this_dir = tmp_path_factory.mktemp("test-proj")
+    creator = ProjectCreator(this_dir, config={"uswds": True})
+    # run the entire creation process
+    creator.run()
+
+    # have to manually pipenv install
+    creator.exec_in_destination(["pipenv", "install"])
+
+    # Try building the docker images here to make the later tests more
+    # reliable.
+    creator.exec_in_destination(["docker", "compose", "build"])
+
+    yield creator
 
 
 @docker_is_running
-def test_docker_tests(project):
+def test_docker_tests(docker_project):
     """Can run tests in docker."""
-    project.exec_in_destination(
+    docker_project.exec_in_destination(
         ["docker", "compose", "run", "app", "python", "manage.py", "migrate"]
     )
-    project.exec_in_destination(
+    docker_project.exec_in_destination(
         ["docker", "compose", "run", "app", "python", "manage.py", "test"]
     )
 
@@ -74,26 +178,14 @@ def _docker_up(project):
             # run in daemon mode
             ["docker", "compose", "up", "-d"]
         )
-        # that might take a while to get up and running, let's just wait
-        # a magic number of seconds. TODO: use a better waiting method
-        time.sleep(5)
+        wait_until_ready("http://localhost:8000/", timeout=120)
         yield
     finally:
         project.exec_in_destination(["docker", "compose", "stop"])
 
 
 @docker_is_running
-def test_page_load(project):
+def test_docker_page_load(docker_project):
     """Can load page running in Docker."""
-    with _docker_up(project):
-        project.exec_in_destination(["curl", "--fail", "localhost:8000"])
-
-
-@docker_is_running
-def test_nonexistent_page(project):
-    """Loading a non-existent page gives an HTTP error code."""
-    with _docker_up(project):
-        with pytest.raises(CalledProcessError):
-            project.exec_in_destination(
-                ["curl", "--fail", "localhost:8000/not/a/valid/url"]
-            )
+    with _docker_up(docker_project):
+        docker_project.exec_in_destination(["curl", "--fail", "localhost:8000"])
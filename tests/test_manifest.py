@@ -0,0 +1,107 @@
+"""Test the manifest of generated files and update mode."""
+
+import json
+
+from django_template.manifest import MANIFEST_NAME
+from django_template.project_creator import ProjectCreator
+
+
+def _regenerate(tmp_path, content):
+    """Write a file with a new ProjectCreator in update mode."""
+    creator = ProjectCreator(tmp_path, config={}, update=True)
+    creator.write_file("file.txt", content)
+    creator.manifest.save()
+    return creator
+
+
+def test_manifest_records_hashes(tmp_path):
+    creator = ProjectCreator(tmp_path, config={})
+    creator.write_file("file.txt", "content")
+    creator.manifest.save()
+    manifest = json.loads((creator.dest_dir / MANIFEST_NAME).read_text())
+    assert list(manifest["files"]) == ["file.txt"]
+
+
+def test_update_skips_unchanged(tmp_path):
+    _regenerate(tmp_path, "content")
+    file_path = tmp_path.resolve() / "file.txt"
+    mtime = file_path.stat().st_mtime_ns
+    creator = _regenerate(tmp_path, "content")
+    assert creator.manifest.results["skipped"] == ["file.txt"]
+    assert file_path.stat().st_mtime_ns == mtime
+
+
+def test_update_writes_changed(tmp_path):
+    _regenerate(tmp_path, "old")
+    creator = _regenerate(tmp_path, "new")
+    assert creator.manifest.results["changed"] == ["file.txt"]
+    assert (creator.dest_dir / "file.txt").read_text() == "new"
+
+
+def test_update_leaves_user_modifications(tmp_path):
+    _regenerate(tmp_path, "old")
+    (tmp_path / "file.txt").write_text("edited")
+    creator = _regenerate(tmp_path, "new")
+    assert creator.manifest.results["modified"] == ["file.txt"]
+    assert (creator.dest_dir / "file.txt").read_text() == "edited"
+    # still modified the next time around
+    creator = _regenerate(tmp_path, "new")
+    assert creator.manifest.results["modified"] == ["file.txt"]
+
+
+def test_update_leaves_files_we_did_not_write(tmp_path):
+    (tmp_path / "file.txt").write_text("not ours")
+    creator = _regenerate(tmp_path, "new")
+    assert creator.manifest.results["modified"] == ["file.txt"]
+    assert (creator.dest_dir / "file.txt").read_text() == "not ours"
+
+
+def test_without_update_overwrites(tmp_path):
+    _regenerate(tmp_path, "old")
+    (tmp_path / "file.txt").write_text("edited")
+    creator = ProjectCreator(tmp_path, config={})
+    creator.write_file("file.txt", "new")
+    assert (creator.dest_dir / "file.txt").read_text() == "new"
+
+
+def test_update_summary(tmp_path):
+    _regenerate(tmp_path, "content")
+    creator = ProjectCreator(tmp_path, config={}, update=True)
+    creator.write_file("file.txt", "content")
+    creator.write_file("other.txt", "content")
+    summary = creator.manifest.summary()
+    assert summary[0].startswith("1 added, 0 changed, 1 unchanged")
+    assert "  added: other.txt" in summary
+
+
+def test_update_settings_directory_twice(tmp_path):
+    creator = ProjectCreator(tmp_path, config={})
+    creator.create_django_app()
+    creator.make_prod_settings()
+    creator.manifest.save()
+
+    creator = ProjectCreator(tmp_path, config={}, update=True)
+    creator.create_django_app()
+    creator.make_prod_settings()
+    assert creator.manifest.results["added"] == []
+    assert creator.manifest.results["changed"] == []
+    assert creator.manifest.results["modified"] == []
+
+
+def test_files_written_twice_are_counted_once(tmp_path):
+    creator = ProjectCreator(tmp_path, config={})
+    creator.create_django_app()
+    creator.make_prod_settings()
+    creator.make_dev_settings()
+    creator.manifest.save()
+    env = creator.dest_dir / creator.app_name / creator.app_name / "settings" / "env.py"
+    env.write_text("# edited\n")
+
+    creator = ProjectCreator(tmp_path, config={}, update=True)
+    creator.create_django_app()
+    # both write the settings directory, env.py included
+    creator.make_prod_settings()
+    creator.make_dev_settings()
+    summary = creator.manifest.summary()
+    assert "1 modified by you and left alone" in summary[0]
+    assert len([line for line in summary if line.endswith("settings/env.py")]) == 1
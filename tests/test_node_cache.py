@@ -0,0 +1,60 @@
+"""Test the cache of installed node_modules."""
+
+import os
+
+from django_template.cache import clone_tree
+from django_template.node_cache import NodeModulesCache
+from django_template.project_creator import ProjectCreator
+
+
+def _make_node_modules(path):
+    (path / "pkg").mkdir(parents=True)
+    (path / "pkg" / "index.js").write_text("module.exports = 1;")
+    (path / ".bin").mkdir()
+    os.symlink("../pkg/index.js", path / ".bin" / "pkg")
+
+
+def test_clone_tree(tmp_path):
+    _make_node_modules(tmp_path / "source")
+    clone_tree(tmp_path / "source", tmp_path / "copy")
+    assert (tmp_path / "copy" / "pkg" / "index.js").read_text() == "module.exports = 1;"
+    assert os.readlink(tmp_path / "copy" / ".bin" / "pkg") == "../pkg/index.js"
+
+
+def test_store_and_restore(tmp_path):
+    cache = NodeModulesCache(tmp_path / "cache")
+    key = cache.key(b"lockfile")
+    assert not cache.restore(key, tmp_path / "first")
+
+    _make_node_modules(tmp_path / "installed")
+    cache.store(key, tmp_path / "installed")
+    # storing again is harmless
+    cache.store(key, tmp_path / "installed")
+    assert cache.restore(key, tmp_path / "restored")
+    assert (tmp_path / "restored" / "pkg" / "index.js").exists()
+    assert not cache.restore(cache.key(b"other lockfile"), tmp_path / "other")
+
+
+def _fake_npm(creator, commands):
+    def exec_in_destination(command):
+        commands.append(command)
+        _make_node_modules(creator.dest_dir / "node_modules")
+
+    creator.exec_in_destination = exec_in_destination
+
+
+def test_npm_install_reused_between_projects(tmp_path):
+    commands = []
+    config = {"uswds": True, "cloud_gov": {}}
+    first = ProjectCreator(tmp_path / "first", config=dict(config), cache_dir=tmp_path)
+    _fake_npm(first, commands)
+    first.set_up_npm()
+    assert commands == [["npm", "install"]]
+
+    second = ProjectCreator(
+        tmp_path / "second", config=dict(config), cache_dir=tmp_path
+    )
+    _fake_npm(second, commands)
+    second.set_up_npm()
+    assert len(commands) == 1
+    assert (second.dest_dir / "node_modules" / "pkg" / "index.js").exists()
@@ -0,0 +1,148 @@
+"""Test the places a project can be written to."""
+
+import io
+import re
+import tarfile
+import zipfile
+
+import pytest
+
+from django_template.downloads import DownloadCache
+from django_template.manifest import MANIFEST_NAME
+from django_template.output import ArchiveOutput, FilesystemOutput, MemoryOutput
+from django_template.project_creator import ProjectCreator
+
+CONFIG = {
+    "uswds": True,
+    "circleci": True,
+    "github_actions": True,
+    "cloud_gov_terraform": True,
+    "cloud_gov": {
+        "organization": "org",
+        "staging_space": "staging",
+        "production_space": "prod",
+    },
+}
+
+
+def _creator(tmp_path, mirror, output):
+    downloads = DownloadCache(cache_dir=tmp_path / "cache", mirror=mirror)
+    return ProjectCreator(
+        tmp_path / "project",
+        config=dict(CONFIG),
+        downloads=downloads,
+        cache_dir=tmp_path / "cache",
+        output=output,
+    )
+
+
+def test_filesystem_output(tmp_path):
+    output = FilesystemOutput(tmp_path)
+    output.make_dirs("a/b")
+    output.write("a/b/file.txt", b"content", 0o600)
+    assert output.exists("a/b/file.txt")
+    assert output.read("a/b/file.txt") == b"content"
+    assert (tmp_path / "a" / "b" / "file.txt").stat().st_mode & 0o777 == 0o600
+    output.remove("a/b/file.txt")
+    assert output.read("a/b/file.txt") is None
+
+
+def test_outputs_stay_inside_the_project(tmp_path):
+    with pytest.raises(ValueError):
+        MemoryOutput().write("../outside", b"")
+    with pytest.raises(ValueError):
+        FilesystemOutput(tmp_path).write("/outside", b"")
+
+
+def test_memory_output_keeps_mode():
+    output = MemoryOutput()
+    output.write("script.sh", b"one", 0o755)
+    output.write("script.sh", b"two")
+    assert output.files["script.sh"] == (b"two", 0o755)
+
+
+def test_run_into_memory(tmp_path, mirror):
+    output = MemoryOutput()
+    creator = _creator(tmp_path, mirror, output)
+    creator.run()
+    assert not creator.dest_dir.exists()
+    app_name = creator.app_name
+    assert f"{app_name}/manage.py" in output.files
+    assert output.files[f"{app_name}/manage.py"][1] == 0o755
+    assert f"{app_name}/{app_name}/settings/prod.py" in output.files
+    assert "package.json" in output.files
+    assert ".circleci/config.yml" in output.files
+    assert MANIFEST_NAME in output.files
+    # there is no repository to put the hook in
+    assert ".git/hooks/pre-commit" not in output.files
+
+
+def test_run_into_memory_matches_filesystem(tmp_path, mirror):
+    output = MemoryOutput()
+    _creator(tmp_path, mirror, output).run()
+    creator = ProjectCreator(
+        tmp_path / "disk" / "project",
+        config={"cloud_gov": CONFIG["cloud_gov"]},
+        downloads=DownloadCache(cache_dir=tmp_path / "cache", mirror=mirror),
+        cache_dir=tmp_path / "cache",
+    )
+    creator.create_django_app()
+    app_name = creator.app_name
+    name = f"{app_name}/{app_name}/urls.py"
+    assert output.files[name][0] == (creator.dest_dir / name).read_bytes()
+
+
+@pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+def test_run_into_archive(tmp_path, mirror, suffix):
+    archive = tmp_path / f"project{suffix}"
+    creator = _creator(tmp_path, mirror, ArchiveOutput(archive, root="project"))
+    creator.run()
+    assert not creator.dest_dir.exists()
+
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive) as f:
+            names = f.namelist()
+            modes = {
+                info.filename: (info.external_attr >> 16) & 0o777
+                for info in f.infolist()
+            }
+            readme = f.read("project/README.md")
+    else:
+        with tarfile.open(archive) as f:
+            names = f.getnames()
+            modes = {info.name: info.mode for info in f.getmembers()}
+            readme = f.extractfile("project/README.md").read()
+    assert modes["project/project/manage.py"] == 0o755
+    scripts = [name for name in names if re.fullmatch(r"project/bin/[^/]+\.sh", name)]
+    assert "project/bin/build.sh" in scripts
+    for name in scripts:
+        assert modes[name] & 0o111 == 0o111, name
+    assert f"project/{MANIFEST_NAME}" in names
+    assert "project/.circleci/config.yml" in names
+    # each file is only added once
+    assert len(names) == len(set(names))
+    assert readme.startswith(b"# ")
+
+
+def test_archive_files_can_change():
+    archive = io.BytesIO()
+    archive.name = "project.tar.gz"
+    output = ArchiveOutput(archive, root="project")
+    output.make_dirs("bin")
+    output.write("bin/run.sh", b"first")
+    output.write("bin/run.sh", b"second")
+    output.chmod("bin/run.sh", 0o755)
+    output.write("settings.py", b"")
+    output.remove("settings.py")
+    output.close()
+
+    archive.seek(0)
+    with tarfile.open(fileobj=archive) as f:
+        assert f.getnames() == ["project", "project/bin", "project/bin/run.sh"]
+        assert f.getmember("project/bin/run.sh").mode == 0o755
+        assert f.extractfile("project/bin/run.sh").read() == b"second"
+
+
+def test_archive_format_from_name(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveOutput(tmp_path / "project.rar", root="project")
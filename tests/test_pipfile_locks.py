@@ -0,0 +1,52 @@
+"""Test that there is an up-to-date lock file for every Pipfile."""
+
+import hashlib
+import json
+
+import pytest
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10
+    import tomli as tomllib
+
+from django_template.pipfile_locks import LOCKS_DIR, lock_name, render_pipfile, variants
+from django_template.project_creator import ProjectCreator
+
+
+def _pipfile_hash(pipfile):
+    """Return the hash that pipenv puts in Pipfile.lock for a Pipfile."""
+    parsed = tomllib.loads(pipfile)
+    data = {
+        "_meta": {"sources": parsed["source"], "requires": parsed.get("requires", {})},
+        "default": parsed.get("packages", {}),
+        "develop": parsed.get("dev-packages", {}),
+    }
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+@pytest.mark.parametrize("config", variants(), ids=lock_name)
+def test_lock_matches_pipfile(config):
+    lock = json.loads((LOCKS_DIR / lock_name(config)).read_text())
+    pipfile = render_pipfile(config)
+    # otherwise `pipenv install --deploy` refuses the lock file
+    assert lock["_meta"]["hash"]["sha256"] == _pipfile_hash(pipfile)
+    for package in ["psycogreen", "whitenoise", "brotli"]:
+        assert package in lock["default"]
+    assert ("uvicorn-worker" in lock["default"]) == ("uvicorn-worker" in pipfile)
+    assert ("redis" in lock["default"]) == ("redis" in pipfile)
+
+
+def test_every_lock_is_used():
+    names = {lock_name(config) for config in variants()}
+    assert names == {path.name for path in LOCKS_DIR.iterdir()}
+
+
+def test_project_gets_its_lock(tmp_path):
+    config = {"server": "asgi", "cache_backend": "redis", "cloud_gov": {}}
+    creator = ProjectCreator(tmp_path, config=config)
+    creator.create_django_app()
+    lock = (creator.dest_dir / "Pipfile.lock").read_bytes()
+    assert lock == (LOCKS_DIR / "asgi-redis.lock").read_bytes()
@@ -0,0 +1,77 @@
+"""Test the per-step profiler."""
+
+import json
+import pstats
+
+import pytest
+
+from django_template import template_command
+from django_template.downloads import DownloadCache
+from django_template.profiling import Profiler, record
+from django_template.project_creator import ProjectCreator
+
+
+def test_record_outside_step_does_nothing():
+    record("bytes_written", 10)
+
+
+def test_step_counters():
+    profiler = Profiler()
+    with profiler.step("first"):
+        record("bytes_written", 10)
+        record("bytes_written", 5)
+    with profiler.step("second"):
+        record("network_bytes", 3)
+    report = profiler.report()
+    first, second = report["steps"]
+    assert first["name"] == "first"
+    assert first["bytes_written"] == 15
+    assert first["wall_seconds"] >= 0
+    assert second["network_bytes"] == 3
+    assert report["totals"]["bytes_written"] == 15
+
+
+def test_creator_profile(tmp_path, mirror):
+    profiler = Profiler(cprofile=True)
+    downloads = DownloadCache(cache_dir=tmp_path / "cache", mirror=mirror)
+    creator = ProjectCreator(
+        tmp_path / "project",
+        config={"uswds": False},
+        downloads=downloads,
+        cache_dir=tmp_path / "cache",
+        profiler=profiler,
+    )
+    creator.run()
+
+    profiler.write_report(tmp_path / "report.json")
+    report = json.loads((tmp_path / "report.json").read_text())
+    steps = {stats["name"]: stats for stats in report["steps"]}
+    assert steps["create_django_app"]["bytes_written"] > 0
+    assert steps["initialize_git"]["subprocess_seconds"] > 0
+
+    profiler.dump_cprofile(tmp_path / "run.prof")
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+
+def test_cprofile_needs_one_job(tmp_path, cli_runner):
+    creator = ProjectCreator(
+        tmp_path / "project", config={"uswds": False}, profiler=Profiler(cprofile=True)
+    )
+    with pytest.raises(ValueError):
+        creator.run(jobs=2)
+
+    result = cli_runner.invoke(
+        template_command,
+        [
+            f"--app-name={tmp_path / 'cli'}",
+            "--no-uswds",
+            "--no-circleci",
+            "--no-github-actions",
+            "--no-cloud-gov-terraform",
+            "--jobs=2",
+            f"--cprofile={tmp_path / 'run.prof'}",
+        ],
+        input="",
+    )
+    assert result.exit_code == 2
+    assert "--jobs greater than 1" in result.output
@@ -0,0 +1,112 @@
+"""Test declaring and scheduling generation steps."""
+
+import threading
+
+import pytest
+
+from django_template.project_creator import ProjectCreator
+from django_template.steps import Step, dependency_graph, run_steps
+
+
+def test_independent_steps_have_no_dependencies():
+    steps = [
+        Step("readme", None, outputs=["README.md"]),
+        Step("license", None, outputs=["LICENSE.md"]),
+    ]
+    assert dependency_graph(steps) == {"readme": [], "license": []}
+
+
+def test_nested_output_is_a_dependency():
+    steps = [
+        Step("app", None, outputs=["app"]),
+        Step("settings", None, outputs=["app/app/settings"]),
+    ]
+    assert dependency_graph(steps)["settings"] == ["app"]
+
+
+def test_input_is_a_dependency():
+    steps = [
+        Step("git", None, outputs=[".git"]),
+        Step("hook", None, inputs=[".git"], outputs=[".git/hooks/pre-commit"]),
+    ]
+    assert dependency_graph(steps)["hook"] == ["git"]
+
+
+def test_overwriting_an_input_is_a_dependency():
+    steps = [
+        Step("reader", None, inputs=["package.json"], outputs=["node_modules"]),
+        Step("writer", None, outputs=["package.json"]),
+    ]
+    assert dependency_graph(steps)["writer"] == ["reader"]
+
+
+def test_similar_names_are_not_dependencies():
+    steps = [
+        Step("app", None, outputs=["app"]),
+        Step("app_two", None, outputs=["app_two"]),
+    ]
+    assert dependency_graph(steps)["app_two"] == []
+
+
+def test_run_steps_respects_dependencies():
+    order = []
+    first_started = threading.Event()
+
+    def first():
+        first_started.set()
+        order.append("first")
+
+    def second():
+        order.append("second")
+
+    def independent():
+        # runs concurrently with first
+        assert first_started.wait(timeout=5)
+        order.append("independent")
+
+    steps = [
+        Step("first", first, outputs=["a"]),
+        Step("independent", independent, outputs=["b"]),
+        Step("second", second, inputs=["a"]),
+    ]
+    run_steps(steps, jobs=2)
+    assert order.index("first") < order.index("second")
+    assert set(order) == {"first", "second", "independent"}
+
+
+def test_run_steps_raises_earliest_failure():
+    ran = []
+
+    def fail_first():
+        raise ValueError("first")
+
+    def fail_second():
+        raise KeyError("second")
+
+    steps = [
+        Step("one", fail_first, outputs=["a"]),
+        Step("two", fail_second, outputs=["b"]),
+        Step("three", lambda: ran.append("three"), inputs=["a"]),
+    ]
+    with pytest.raises(ValueError):
+        run_steps(steps, jobs=4)
+    # dependent steps don't start after a failure
+    assert ran == []
+
+
+def test_creator_steps_follow_config(tmp_path):
+    creator = ProjectCreator(tmp_path, config={"uswds": False, "circleci": True})
+    names = [current.name for current in creator.steps()]
+    assert "create_django_app" in names
+    assert "set_up_circleci" in names
+    assert "set_up_npm" not in names
+    assert "set_up_terraform" not in names
+
+
+def test_creator_steps_use_app_name(tmp_path):
+    creator = ProjectCreator(tmp_path, config={})
+    graph = dependency_graph(creator.steps())
+    assert "create_django_app" in graph["make_prod_settings"]
+    assert "make_prod_settings" in graph["make_dev_settings"]
+    assert "initialize_git" in graph["setup_precommit_hook"]
+    assert graph["get_policy_files"] == []
@@ -1,5 +1,8 @@
 """Test template script."""
 
+import os
+import runpy
+
 import pytest
 
 from subprocess import check_call, CalledProcessError
@@ -124,6 +127,123 @@ def test_prod_settings(creator):
     creator.make_prod_settings()
     settings_dir = creator.dest_dir / creator.app_name / creator.app_name / "settings"
     assert (settings_dir / "prod.py").exists()
+    prod = (settings_dir / "prod.py").read_text()
+    assert "whitenoise.middleware.WhiteNoiseMiddleware" in prod
+    assert "CompressedManifestStaticFilesStorage" in prod
+    assert "structured_logging.QueueHandler" in prod
+    assert "logging.FileHandler" not in prod
+    assert "METRICS_TOKEN" in prod
+
+
+@pytest.mark.parametrize(
+    "backend, expected",
+    [
+        ("locmem", None),
+        ("file", "FileBasedCache"),
+        ("db", "DatabaseCache"),
+        ("redis", "RedisCache"),
+    ],
+)
+def test_prod_cache_backend(tmp_path, backend, expected):
+    creator = ProjectCreator(
+        tmp_path, config={"cache_backend": backend, "cloud_gov": {}}
+    )
+    creator.create_django_app()
+    creator.make_prod_settings()
+    settings_dir = creator.dest_dir / creator.app_name / creator.app_name / "settings"
+    prod = (settings_dir / "prod.py").read_text()
+    if expected is None:
+        # the local memory cache from base.py
+        assert "CACHES" not in prod
+    else:
+        assert expected in prod
+    # bin/build.sh loads prod.py where no cache is configured
+    assert 'os.environ["REDIS_URL"]' not in prod
+    assert (
+        creator.dest_dir / creator.app_name / creator.app_name / "caching.py"
+    ).exists()
+
+
+@pytest.mark.parametrize(
+    "backend, engine",
+    [
+        ("db", "{app_name}.sessions"),
+        ("cached_db", "{app_name}.sessions"),
+        ("cache", "django.contrib.sessions.backends.cache"),
+        ("signed_cookies", "django.contrib.sessions.backends.signed_cookies"),
+    ],
+)
+def test_session_backend(tmp_path, backend, engine):
+    creator = ProjectCreator(
+        tmp_path,
+        config={"session_backend": backend, "cache_backend": "redis", "cloud_gov": {}},
+    )
+    creator.create_django_app()
+    creator.make_dev_settings()
+    app_dir = creator.dest_dir / creator.app_name / creator.app_name
+    base = (app_dir / "settings" / "base.py").read_text()
+    assert f'SESSION_ENGINE = "{engine.format(app_name=creator.app_name)}"' in base
+    sessions = app_dir / "sessions.py"
+    assert sessions.exists() == engine.endswith(".sessions")
+    if sessions.exists():
+        assert f"sessions.backends.{backend} import" in sessions.read_text()
+
+
+@pytest.mark.parametrize("jinja2", [False, True])
+def test_templates(tmp_path, jinja2):
+    creator = ProjectCreator(tmp_path, config={"jinja2": jinja2, "cloud_gov": {}})
+    creator.create_django_app()
+    creator.make_prod_settings()
+    app_dir = creator.dest_dir / creator.app_name / creator.app_name
+    base = (app_dir / "settings" / "base.py").read_text()
+    prod = (app_dir / "settings" / "prod.py").read_text()
+    assert "django.template.loaders.cached.Loader" in prod
+    assert "context_processors.fragment_cache" in base
+    assert "{% cache " in (app_dir / "templates" / "base.html").read_text()
+    assert ("backends.jinja2.Jinja2" in base) == jinja2
+    assert (app_dir / "jinja2.py").exists() == jinja2
+
+
+def _gunicorn_settings(path, monkeypatch, **environ):
+    monkeypatch.delenv("MEMORY_LIMIT", raising=False)
+    # gunicorn.conf.py sets it, so have monkeypatch restore it afterwards
+    monkeypatch.setenv("WEB_CONCURRENCY", "")
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(path))
+
+
+@pytest.mark.parametrize(
+    "memory_limit, most_workers", [("256M", 1), ("512m", 3), ("1G", 7)]
+)
+def test_gunicorn_config(creator, monkeypatch, memory_limit, most_workers):
+    creator.create_django_app()
+    path = creator.dest_dir / creator.app_name / "gunicorn.conf.py"
+    settings = _gunicorn_settings(
+        path, monkeypatch, MEMORY_LIMIT=memory_limit, GUNICORN_WORKER_CLASS="sync"
+    )
+    assert 1 <= settings["workers"] <= most_workers
+    assert settings["preload_app"]
+    assert settings["max_requests_jitter"] > 0
+    # the database pool sizing in prod.py reads the worker count from here
+    assert os.environ["WEB_CONCURRENCY"] == str(settings["workers"])
+    settings = _gunicorn_settings(
+        path, monkeypatch, WEB_CONCURRENCY="5", GUNICORN_WORKER_CLASS="sync"
+    )
+    assert settings["workers"] == 5
+
+
+def test_asgi_server(tmp_path):
+    creator = ProjectCreator(tmp_path, config={"server": "asgi", "cloud_gov": {}})
+    creator.create_django_app()
+    creator.set_up_terraform()
+    app_dir = creator.dest_dir / creator.app_name / creator.app_name
+    assert exists_and_non_empty(app_dir / "views.py")
+    assert "views.status" in (app_dir / "urls.py").read_text()
+    web = (creator.dest_dir / "bin" / "web.sh").read_text()
+    assert f"{creator.app_name}.asgi:application" in web
+    staging = (creator.dest_dir / "config" / "deployment" / "staging.yml").read_text()
+    assert "worker_class: uvicorn_worker.UvicornWorker" in staging
 
 
 def test_dev_settings(creator):
@@ -181,6 +301,12 @@ def test_github_actions(creator):
     creator.set_up_github_actions()
     assert (creator.dest_dir / ".github" / "actions").exists()
     assert (creator.dest_dir / ".github" / "workflows").exists()
+    run_server = creator.dest_dir / ".github" / "actions" / "run-server" / "action.yml"
+    action = run_server.read_text()
+    # prod.py turns DEBUG off, so pages need the collected static files
+    assert action.index("collectstatic") < action.index("runserver")
+    assert "gulp compile" in action
+    assert "curl --fail" in action
 
 
 def test_terraform(creator):
@@ -189,3 +315,26 @@ def test_terraform(creator):
     assert dir_exists_and_non_empty(creator.dest_dir / "bin" / "ops")
     assert exists_and_non_empty(creator.dest_dir / "manifest.yml")
     assert dir_exists_and_non_empty(creator.dest_dir / "config" / "deployment")
+    for script in ["build.sh", "migrate.sh", "deploy.sh", "web.sh", "worker.sh"]:
+        assert os.access(creator.dest_dir / "bin" / script, os.X_OK)
+    assert "worker: bin/worker.sh" in (creator.dest_dir / "Procfile").read_text()
+    assert "type: worker" in (creator.dest_dir / "manifest.yml").read_text()
+    # instances start without migrating or collecting static files
+    web = (creator.dest_dir / "bin" / "web.sh").read_text()
+    assert "manage.py migrate" not in web
+    assert "manage.py collectstatic" not in web
+
+
+def test_django_app_created_in_process(creator, monkeypatch):
+    def no_subprocesses(command):
+        raise AssertionError(f"ran {command}")
+
+    monkeypatch.setattr(creator, "exec_in_destination", no_subprocesses)
+    creator.create_django_app()
+    app_dir = creator.dest_dir / creator.app_name / creator.app_name
+    for filename in ["__init__.py", "asgi.py", "wsgi.py", "urls.py"]:
+        assert exists_and_non_empty(app_dir / filename) or filename == "__init__.py"
+    with open(app_dir / "settings" / "base.py", "r") as f:
+        base_settings = f.read()
+    assert '"DIRS": [BASE_DIR / "templates"]' in base_settings
+    compile(base_settings, "base.py", "exec")
@@ -0,0 +1,69 @@
+"""Test the template index and its bytecode cache."""
+
+import os
+
+import pytest
+
+from django_template.template_index import TemplateIndex
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    templates = tmp_path / "templates"
+    (templates / "sub" / "dir").mkdir(parents=True)
+    (templates / "hello.txt.jinja").write_text("Hello {{ name }}")
+    (templates / "sub" / "run.sh").write_text("#!/bin/sh")
+    (templates / "sub" / "run.sh").chmod(0o755)
+    (templates / "sub" / "dir" / "file.txt").write_text("plain")
+    yield templates
+
+
+def test_index_records_files(templates_dir, tmp_path):
+    index = TemplateIndex(templates_dir, cache_dir=tmp_path / "cache")
+    assert "hello.txt.jinja" in index
+    assert index["sub"].is_dir
+    assert index["sub/run.sh"].mode & 0o777 == 0o755
+    assert index["sub/run.sh"].path == templates_dir / "sub" / "run.sh"
+
+
+def test_walk(templates_dir, tmp_path):
+    index = TemplateIndex(templates_dir, cache_dir=tmp_path / "cache")
+    names = [template_file.name for template_file in index.walk("sub")]
+    assert names == ["sub/dir", "sub/dir/file.txt", "sub/run.sh"]
+
+
+def test_render_with_globals(templates_dir, tmp_path):
+    index = TemplateIndex(
+        templates_dir, globals={"name": "world"}, cache_dir=tmp_path / "cache"
+    )
+    assert index.get_template("hello.txt.jinja").render() == "Hello world"
+    # compiled template is kept in the index
+    assert index["hello.txt.jinja"].template is index.get_template("hello.txt.jinja")
+
+
+def test_bytecode_cache_reused(templates_dir, tmp_path, monkeypatch):
+    TemplateIndex(templates_dir, cache_dir=tmp_path / "cache").precompile()
+
+    index = TemplateIndex(
+        templates_dir, globals={"name": "again"}, cache_dir=tmp_path / "cache"
+    )
+
+    def no_compiling(*args, **kwargs):
+        raise AssertionError("template was compiled")
+
+    monkeypatch.setattr(index.environment, "compile", no_compiling)
+    assert index.get_template("hello.txt.jinja").render() == "Hello again"
+
+
+def test_bytecode_cache_invalidated_by_edit(templates_dir, tmp_path):
+    TemplateIndex(templates_dir, cache_dir=tmp_path / "cache").precompile()
+
+    template_path = templates_dir / "hello.txt.jinja"
+    template_path.write_text("Goodbye {{ name }}")
+    stat = template_path.stat()
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    index = TemplateIndex(
+        templates_dir, globals={"name": "world"}, cache_dir=tmp_path / "cache"
+    )
+    assert index.get_template("hello.txt.jinja").render() == "Goodbye world"